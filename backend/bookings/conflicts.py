@@ -0,0 +1,39 @@
+from django.db.models import Exists, F, OuterRef
+
+# Queries for the rows the bookings_booking_room_no_overlap constraint
+# (migration 0004) refuses. They take a queryset rather than the model so
+# the migration can run them on its historical model.
+
+
+def room_bookings(queryset):
+    return queryset.filter(
+        kind="room",
+        room__isnull=False,
+        check_in__isnull=False,
+        check_out__isnull=False,
+    )
+
+
+def inverted(queryset):
+    """Room bookings checking out before they check in"""
+
+    return room_bookings(queryset).filter(check_in__gt=F("check_out"))
+
+
+def overlapping(queryset):
+    """Room bookings sharing at least one day with another of the same room"""
+
+    bookings = room_bookings(queryset).filter(check_in__lte=F("check_out"))
+    others = bookings.filter(
+        room=OuterRef("room"),
+        check_in__lte=OuterRef("check_out"),
+        check_out__gte=OuterRef("check_in"),
+    ).exclude(pk=OuterRef("pk"))
+    return bookings.filter(Exists(others)).order_by("room", "check_in", "pk")
+
+
+def describe(booking):
+    return (
+        f"#{booking.pk} room {booking.room_id} "
+        f"{booking.check_in}..{booking.check_out}"
+    )
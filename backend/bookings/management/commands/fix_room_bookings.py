@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from bookings.conflicts import describe, inverted, overlapping, room_bookings
+from bookings.models import Booking
+
+
+def plan(queryset):
+    """The bookings to swap the dates of and to delete to leave no conflicts.
+
+    Inverted bookings get their dates swapped. Of bookings that overlap,
+    the one made first stays and the later ones are deleted.
+    """
+
+    swap = list(inverted(queryset))
+    rooms = {booking.room_id for booking in swap}
+    rooms.update(overlapping(queryset).order_by().values_list("room_id", flat=True))
+    delete = []
+    for room in sorted(rooms):
+        kept = []
+        for booking in (
+            room_bookings(queryset).filter(room=room).order_by("created_at", "pk")
+        ):
+            check_in, check_out = sorted((booking.check_in, booking.check_out))
+            if any(check_in <= end and check_out >= start for start, end in kept):
+                delete.append(booking)
+            else:
+                kept.append((check_in, check_out))
+    return swap, delete
+
+
+class Command(BaseCommand):
+    help = (
+        "List the room bookings that overlap or check out before they check "
+        "in, which the no-overlap constraint refuses; with --apply, swap the "
+        "dates of inverted bookings and delete the later of overlapping ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--apply", action="store_true")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            swap, delete = plan(Booking.objects)
+            for booking in swap:
+                self.stdout.write(f"swap dates of {describe(booking)}")
+            for booking in delete:
+                self.stdout.write(f"delete {describe(booking)}")
+            if not (swap or delete):
+                self.stdout.write(self.style.SUCCESS("No conflicting bookings"))
+                return
+            if not options["apply"]:
+                self.stdout.write("Dry run, pass --apply to make these changes")
+                return
+            for booking in swap:
+                booking.check_in, booking.check_out = (
+                    booking.check_out,
+                    booking.check_in,
+                )
+                booking.save(update_fields=["check_in", "check_out"])
+            Booking.objects.filter(pk__in=[booking.pk for booking in delete]).delete()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Swapped {len(swap)} and deleted {len(delete)} bookings"
+            )
+        )
@@ -0,0 +1,90 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:52
+
+from django.conf import settings
+from django.db import migrations, models
+from bookings.conflicts import describe, inverted, overlapping
+
+ADD_EXCLUSION = """
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+ALTER TABLE bookings_booking
+    ADD CONSTRAINT bookings_booking_room_no_overlap
+    EXCLUDE USING gist (
+        room_id WITH =,
+        daterange(check_in, check_out, '[]') WITH &&
+    )
+    WHERE (
+        kind = 'room'
+        AND room_id IS NOT NULL
+        AND check_in IS NOT NULL
+        AND check_out IS NOT NULL
+    );
+"""
+
+DROP_EXCLUSION = """
+ALTER TABLE bookings_booking DROP CONSTRAINT IF EXISTS bookings_booking_room_no_overlap;
+"""
+
+
+def check_room_bookings(apps):
+    """Refuse to go on while bookings the constraint can't hold exist.
+
+    Without this, ADD CONSTRAINT fails on the first overlapping pair or
+    inverted date range with an error that names neither.
+    """
+
+    Booking = apps.get_model("bookings", "Booking")
+    problems = [
+        *(
+            f"{describe(b)} checks out before it checks in"
+            for b in inverted(Booking.objects)
+        ),
+        *(
+            f"{describe(b)} overlaps another booking"
+            for b in overlapping(Booking.objects)
+        ),
+    ]
+    if problems:
+        shown = "\n".join(f"  {problem}" for problem in problems[:50])
+        more = f"\n  and {len(problems) - 50} more" if len(problems) > 50 else ""
+        raise RuntimeError(
+            "Can't add bookings_booking_room_no_overlap, these room bookings "
+            f"break it:\n{shown}{more}\n"
+            "Run `python manage.py fix_room_bookings` to see how they would "
+            "be resolved and `--apply` to resolve them, then migrate again."
+        )
+
+
+def run_on_postgres(sql, check=None):
+    # The exclusion constraint needs range types and GiST, which only
+    # Postgres has. SQLite (local development) keeps the btree index only.
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == "postgresql":
+            if check:
+                check(apps)
+            schema_editor.execute(sql)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("bookings", "0003_alter_booking_experience_alter_booking_room_and_more"),
+        ("experiences", "0005_created_at_index"),
+        ("rooms", "0007_created_at_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="booking",
+            index=models.Index(
+                fields=["room", "kind", "check_in", "check_out"],
+                name="bookings_bo_room_id_844d2a_idx",
+            ),
+        ),
+        migrations.RunPython(
+            run_on_postgres(ADD_EXCLUSION, check_room_bookings),
+            run_on_postgres(DROP_EXCLUSION),
+        ),
+    ]
@@ -2,6 +2,18 @@ from django.db import models
 from common.models import CommonModel
 
 
+class BookingQuerySet(models.QuerySet):
+
+    def overlapping(self, room, check_in, check_out):
+        """Room bookings sharing at least one day with [check_in, check_out]"""
+        return self.filter(
+            room=room,
+            kind=Booking.BookingKindChoices.ROOM,
+            check_in__lte=check_out,
+            check_out__gte=check_in,
+        )
+
+
 class Booking(CommonModel):
     "Booking Model Definition"
 
@@ -46,5 +58,12 @@ class Booking(CommonModel):
     )
     guests = models.PositiveIntegerField()
 
+    objects = BookingQuerySet.as_manager()
+
     def __str__(self) -> str:
         return f"{self.kind.title()} booking for: {self.user}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["room", "kind", "check_in", "check_out"]),
+        ]
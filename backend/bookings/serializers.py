@@ -1,5 +1,7 @@
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.exceptions import APIException
+from rest_framework.status import HTTP_409_CONFLICT
 
 from experiences.serializers import SmallExperienceSerializer
 from rooms.serializers import SmallRoomSerializer
@@ -7,6 +9,23 @@ from rooms.serializers import SmallRoomSerializer
 from .models import Booking
 
 
+class BookingConflict(APIException):
+    status_code = HTTP_409_CONFLICT
+    default_detail = "Those (or some of those) dates are already taken."
+    default_code = "booking_conflict"
+
+
+# Added on Postgres by migration 0004_room_booking_overlap
+OVERLAP_CONSTRAINT = "bookings_booking_room_no_overlap"
+
+
+def is_overlap_violation(error):
+    """Whether an IntegrityError was raised by the room overlap constraint"""
+
+    diag = getattr(error.__cause__, "diag", None)
+    return getattr(diag, "constraint_name", None) == OVERLAP_CONSTRAINT
+
+
 class CreateRoomBookingSerializer(serializers.ModelSerializer):
 
     check_in = serializers.DateField()
@@ -41,18 +60,16 @@ class CreateRoomBookingSerializer(serializers.ModelSerializer):
                 "Check in should be smaller than check out."
             )
 
-        bookings = Booking.objects.filter(
-            check_in__lte=data["check_out"],
-            check_out__gte=data["check_in"],
-            room=room,
+        bookings = Booking.objects.overlapping(
+            room,
+            data["check_in"],
+            data["check_out"],
         )
         if self.context.get("pk"):
             bookings = bookings.exclude(pk=self.context["pk"])
 
         if bookings.exists():
-            raise serializers.ValidationError(
-                "Those (or some of those) dates are already taken."
-            )
+            raise BookingConflict
 
         return data
 
@@ -154,3 +171,47 @@ class PrivateExperienceBookingSerializer(serializers.ModelSerializer):
             return booking.experience.end
         else:
             return None
+
+
+def date_data(value):
+    return value.isoformat() if value else None
+
+
+def public_room_booking_data(bookings):
+    """PublicRoomBookingSerializer(bookings, many=True).data from plain rows"""
+
+    return [
+        {
+            "pk": booking["pk"],
+            "check_in": date_data(booking["check_in"]),
+            "check_out": date_data(booking["check_out"]),
+            "guests": booking["guests"],
+        }
+        for booking in bookings.values("pk", "check_in", "check_out", "guests")
+    ]
+
+
+def private_room_booking_data(bookings):
+    """PrivateRoomBookingSerializer(bookings, many=True).data from plain rows"""
+
+    return [
+        {
+            "pk": booking["pk"],
+            "check_in": date_data(booking["check_in"]),
+            "check_out": date_data(booking["check_out"]),
+            "guests": booking["guests"],
+            "room": (
+                {"pk": booking["room_id"], "name": booking["room__name"]}
+                if booking["room_id"]
+                else None
+            ),
+        }
+        for booking in bookings.values(
+            "pk",
+            "check_in",
+            "check_out",
+            "guests",
+            "room_id",
+            "room__name",
+        )
+    ]
@@ -1,3 +1,100 @@
-from django.test import TestCase
+import datetime
+from importlib import import_module
+from io import StringIO
+from django.apps import apps
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+from users.models import User
+from rooms.models import Room
+from .models import Booking
+from .serializers import PrivateRoomBookingSerializer, private_room_booking_data
 
-# Create your tests here.
+
+class TestListData(APITestCase):
+
+    def test_private_room_booking_data(self):
+        user = User.objects.create(username="guest")
+        room = Room.objects.create(
+            name="Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=user,
+        )
+        for check_in, check_out in (
+            ("2030-01-10", "2030-01-15"),
+            ("2030-02-10", "2030-02-15"),
+        ):
+            Booking.objects.create(
+                kind=Booking.BookingKindChoices.ROOM,
+                user=user,
+                room=room,
+                check_in=check_in,
+                check_out=check_out,
+                guests=1,
+            )
+        Booking.objects.filter(check_in="2030-02-10").update(room=None)
+        bookings = Booking.objects.order_by("pk")
+        self.assertEqual(
+            private_room_booking_data(bookings),
+            PrivateRoomBookingSerializer(bookings, many=True).data,
+        )
+
+
+class TestRoomBookingConflicts(APITestCase):
+
+    def setUp(self):
+        user = User.objects.create(username="guest")
+        room = Room.objects.create(
+            name="Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=user,
+        )
+        self.first, self.second, self.inverted, self.apart = (
+            Booking.objects.create(
+                kind=Booking.BookingKindChoices.ROOM,
+                user=user,
+                room=room,
+                check_in=datetime.date(2030, 1, check_in),
+                check_out=datetime.date(2030, 1, check_out),
+                guests=1,
+            )
+            for check_in, check_out in ((1, 5), (3, 7), (12, 10), (20, 22))
+        )
+        self.migration = import_module("bookings.migrations.0004_room_booking_overlap")
+
+    def test_migration_lists_conflicts(self):
+        with self.assertRaisesMessage(RuntimeError, "fix_room_bookings") as raised:
+            self.migration.check_room_bookings(apps)
+        message = str(raised.exception)
+        self.assertIn(f"#{self.inverted.pk} room", message)
+        self.assertIn(f"#{self.first.pk} room", message)
+        self.assertIn(f"#{self.second.pk} room", message)
+        self.assertNotIn(f"#{self.apart.pk} room", message)
+
+    def test_dry_run(self):
+        out = StringIO()
+        call_command("fix_room_bookings", stdout=out)
+        self.assertIn(f"swap dates of #{self.inverted.pk}", out.getvalue())
+        self.assertIn(f"delete #{self.second.pk}", out.getvalue())
+        self.assertEqual(Booking.objects.count(), 4)
+
+    def test_apply(self):
+        call_command("fix_room_bookings", "--apply", stdout=StringIO())
+        self.assertEqual(
+            set(Booking.objects.values_list("pk", flat=True)),
+            {self.first.pk, self.inverted.pk, self.apart.pk},
+        )
+        self.inverted.refresh_from_db()
+        self.assertEqual(
+            (self.inverted.check_in.day, self.inverted.check_out.day), (10, 12)
+        )
+        self.migration.check_room_bookings(apps)
@@ -5,7 +5,7 @@ from .models import Booking
 from .serializers import (
     BookingSerializer,
     PrivateExperienceBookingSerializer,
-    PrivateRoomBookingSerializer,
+    private_room_booking_data,
 )
 
 
@@ -28,11 +28,7 @@ class RoomBookings(APIView):
             kind=Booking.BookingKindChoices.ROOM,
             check_in__gt=now,
         ).order_by("check_in")
-        serializer = PrivateRoomBookingSerializer(
-            bookings,
-            many=True,
-        )
-        return Response(serializer.data)
+        return Response(private_room_booking_data(bookings))
 
 
 class ExperienceBookings(APIView):
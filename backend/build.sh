@@ -11,6 +11,9 @@ python manage.py collectstatic --no-input
 # Apply any outstanding database migrations
 python manage.py migrate
 
+# Table of the shared "default" cache, see CACHES in config/settings.py
+python manage.py createcachetable
+
 # if [[ $CREATE_SUPERUSER ]];
 # then
 #   python manage.py createsuperuser --no-input
@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.utils.http import http_date
+from rest_framework.test import APITestCase
+from .models import Category
 
-# Create your tests here.
+
+class TestCategoryConditionalGet(APITestCase):
+
+    URL = "/api/v1/categories/"
+
+    def setUp(self):
+        self.category = Category.objects.create(
+            name="Beach",
+            kind=Category.CategoryKindChoices.ROOMS,
+        )
+
+    def test_list_not_modified(self):
+        etag = self.client.get(self.URL).headers["ETag"]
+        response = self.client.get(self.URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.category.delete()
+        response = self.client.get(self.URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    def test_list_deleted_row(self):
+        newer = Category.objects.create(
+            name="Mountain",
+            kind=Category.CategoryKindChoices.ROOMS,
+        )
+        response = self.client.get(self.URL)
+        self.assertNotIn("Last-Modified", response.headers)
+        self.category.delete()
+        response = self.client.get(
+            self.URL,
+            headers={"If-Modified-Since": http_date(newer.updated_at.timestamp())},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([c["pk"] for c in response.json()], [newer.pk])
+
+    def test_detail_not_modified(self):
+        url = f"{self.URL}{self.category.pk}"
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response.headers)
+        response = self.client.get(
+            url,
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
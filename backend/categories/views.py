@@ -1,4 +1,5 @@
 from rest_framework.viewsets import ModelViewSet
+from common.conditional import aggregate_validators, conditional
 from .models import Category
 from .serializers import CategorySerializer
 
@@ -6,3 +7,21 @@ from .serializers import CategorySerializer
 class CategoryViewSet(ModelViewSet):
     serializer_class = CategorySerializer
     queryset = Category.objects.filter(kind=Category.CategoryKindChoices.ROOMS)
+
+    def get_list_validators(self, request):
+        return aggregate_validators(self.queryset)
+
+    def get_detail_validators(self, request, pk):
+        category = self.queryset.filter(pk=pk).values("updated_at").first()
+        if category is None:
+            return None, None
+        updated_at = category["updated_at"]
+        return f"category-{pk}-{updated_at.timestamp()}", updated_at
+
+    @conditional(get_list_validators)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional(get_detail_validators)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,87 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def version_key(name, pk):
+    return f"{name}:{pk}:version"
+
+
+def get_version(name, pk):
+    key = version_key(name, pk)
+    version = cache.get(key)
+    if version is None:
+        # Start from a value no earlier entry could have used, so data cached
+        # before the counter was evicted is never served again.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_version(name, pk):
+    key = version_key(name, pk)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def incr_version(name, pk):
+    try:
+        cache.incr(version_key(name, pk))
+    except ValueError:
+        get_version(name, pk)
+
+
+def bump_version(name, pk):
+    """Invalidate the cached entries of an object.
+
+    The bump waits for the current transaction to commit; done earlier, a
+    concurrent read could cache the uncommitted row under the new version.
+    """
+
+    transaction.on_commit(lambda: incr_version(name, pk))
+
+
+def bump_versions(name, pks):
+    pks = list(pks)
+
+    def incr_versions():
+        for pk in pks:
+            incr_version(name, pk)
+
+    transaction.on_commit(incr_versions)
+
+
+def cached_key(name, pk, version, variant):
+    key = f"{name}:{pk}:{version}"
+    if variant is not None:
+        key = f"{key}:{variant}"
+    return key
+
+
+def get_cached(name, pk, build, variant=None):
+    """Return build() for the object, cached until its version is bumped.
+
+    variant tells apart different representations of the same object.
+    """
+
+    key = cached_key(name, pk, get_version(name, pk), variant)
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout=settings.DETAIL_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_cached(name, pk, build, variant=None):
+    """get_cached() with an async build()"""
+
+    key = cached_key(name, pk, await aget_version(name, pk), variant)
+    value = await cache.aget(key)
+    if value is None:
+        value = await build()
+        await cache.aset(key, value, timeout=settings.DETAIL_CACHE_TIMEOUT)
+    return value
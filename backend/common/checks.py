@@ -0,0 +1,24 @@
+import os
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+LOCMEM = "django.core.cache.backends.locmem.LocMemCache"
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """The detail cache's version counters only work if workers share them"""
+
+    workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+    if workers > 1 and settings.CACHES["default"]["BACKEND"] == LOCMEM:
+        return [
+            Error(
+                f"The default cache is per process but {workers} workers "
+                "are configured, so cache invalidation only reaches one of "
+                "them.",
+                hint="Set CACHE_URL to a shared backend such as Redis or "
+                "dbcache://django_cache.",
+                id="common.E001",
+            )
+        ]
+    return []
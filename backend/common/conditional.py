@@ -0,0 +1,130 @@
+from functools import wraps
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from .pagination import get_page_params, page_queryset
+
+AGGREGATES = {
+    "count": Count("pk"),
+    "pks": Sum("pk"),
+    "last_modified": Max("updated_at"),
+}
+
+
+def stats_validators(stats, *parts):
+    last_modified = stats["last_modified"]
+    etag = ":".join(
+        str(part)
+        for part in (
+            stats["count"],
+            stats["pks"] or 0,
+            last_modified.timestamp() if last_modified else 0,
+            *parts,
+        )
+    )
+    return etag, None
+
+
+def aggregate_validators(queryset, *parts):
+    """ETag for a set of rows, from one aggregate query.
+
+    max(updated_at) covers inserts and saves, while the count and the sum
+    of pks change when rows leave the set. Extra parts (e.g. the viewer) are
+    mixed into the ETag.
+
+    There's no Last-Modified: max(updated_at) stays put when a row leaves
+    the set and doesn't know the viewer, so If-Modified-Since would get a
+    304 for a list that changed.
+    """
+
+    return stats_validators(queryset.order_by().aggregate(**AGGREGATES), *parts)
+
+
+async def aaggregate_validators(queryset, *parts):
+    stats = await queryset.order_by().aaggregate(**AGGREGATES)
+    return stats_validators(stats, *parts)
+
+
+def page_rows(request, queryset, page_size):
+    cursor, page_size = get_page_params(request, page_size)
+    page = page_queryset(queryset, cursor, page_size)
+    return queryset.model.objects.filter(pk__in=page.values("pk"))
+
+
+def page_validators(request, queryset, page_size, *parts):
+    """aggregate_validators() over just the rows of the requested page"""
+
+    return aggregate_validators(page_rows(request, queryset, page_size), *parts)
+
+
+async def apage_validators(request, queryset, page_size, *parts):
+    return await aaggregate_validators(
+        page_rows(request, queryset, page_size),
+        *parts,
+    )
+
+
+def not_modified(request, etag, last_modified):
+    """The 304 response for a request, if its validators still match"""
+
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+
+def set_validators(response, etag, last_modified):
+    if etag:
+        response.headers.setdefault("ETag", etag)
+    if last_modified:
+        response.headers.setdefault("Last-Modified", http_date(last_modified))
+    return response
+
+
+def prepare_validators(etag, last_modified):
+    etag = quote_etag(etag) if etag else None
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+    return etag, last_modified
+
+
+def conditional(get_validators):
+    """Answer GET/HEAD with 304 Not Modified before the view method runs.
+
+    get_validators is called like the view method and returns an
+    (etag, last_modified) pair; either may be None.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def inner(view, request, *args, **kwargs):
+            etag, last_modified = prepare_validators(
+                *get_validators(view, request, *args, **kwargs)
+            )
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+            return set_validators(response, etag, last_modified)
+
+        return inner
+
+    return decorator
+
+
+def aconditional(get_validators):
+    """conditional() for async view methods and async get_validators"""
+
+    def decorator(method):
+        @wraps(method)
+        async def inner(view, request, *args, **kwargs):
+            etag, last_modified = prepare_validators(
+                *await get_validators(view, request, *args, **kwargs)
+            )
+            response = not_modified(request, etag, last_modified)
+            if response is None:
+                response = await method(view, request, *args, **kwargs)
+            return set_validators(response, etag, last_modified)
+
+        return inner
+
+    return decorator
@@ -0,0 +1,149 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class CircuitOpen(requests.RequestException):
+    """An upstream failed too often lately and is not called for a while"""
+
+
+class CircuitBreaker:
+    """Opens after `threshold` failures in a row and fails fast until
+    `reset_after` seconds have passed; then one trial call decides whether
+    it closes again.
+    """
+
+    def __init__(self, threshold, reset_after):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_after:
+                raise CircuitOpen("Circuit open")
+            # Half open: let this call through, and keep failing fast for
+            # the others until it is done.
+            self.opened_at = time.monotonic()
+
+    def succeeded(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failed(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class HTTPClient:
+    """Outbound HTTP shared by the whole process.
+
+    One requests.Session keeps pooled keep-alive connections per host.
+    Every call has a timeout. Connection errors, and 502/503/504 answers to
+    idempotent methods, are retried with exponential backoff. Each host has
+    its own circuit breaker.
+    """
+
+    def __init__(
+        self,
+        timeout,
+        retries,
+        backoff,
+        pool_size,
+        breaker_threshold,
+        breaker_reset,
+    ):
+        self.timeout = timeout
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                # The upstream may have acted on a request it did not answer
+                # in time, so read timeouts are raised right away.
+                read=False,
+                backoff_factor=backoff,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def breaker(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(
+                    self.breaker_threshold,
+                    self.breaker_reset,
+                )
+            return self.breakers[host]
+
+    def request(self, method, url, timeout=None, **kwargs):
+        breaker = self.breaker(url)
+        breaker.before_call()
+        try:
+            response = self.session.request(
+                method,
+                url,
+                timeout=timeout or self.timeout,
+                **kwargs,
+            )
+        except requests.RequestException:
+            breaker.failed()
+            raise
+        if response.status_code >= 500:
+            breaker.failed()
+        else:
+            breaker.succeeded()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def reset(self):
+        with self.lock:
+            self.breakers.clear()
+
+
+http = HTTPClient(
+    timeout=settings.OUTBOUND_HTTP_TIMEOUT,
+    retries=settings.OUTBOUND_HTTP_RETRIES,
+    backoff=settings.OUTBOUND_HTTP_BACKOFF,
+    pool_size=settings.OUTBOUND_HTTP_POOL_SIZE,
+    breaker_threshold=settings.OUTBOUND_HTTP_BREAKER_THRESHOLD,
+    breaker_reset=settings.OUTBOUND_HTTP_BREAKER_RESET,
+)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.OUTBOUND_HTTP_POOL_SIZE,
+    thread_name_prefix="outbound-http",
+)
+
+
+def concurrently(*calls):
+    """Run independent calls (callables) at the same time, return results"""
+
+    futures = [executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
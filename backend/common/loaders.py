@@ -0,0 +1,26 @@
+class BatchLoader:
+    """Per-request loader that fetches many keys with one call.
+
+    The GraphQL view executes synchronously, so list items are resolved one
+    after the other and there is no event loop tick to batch on. Instead the
+    resolver returning a list queues the keys its items will ask for, and
+    the first load() fetches every queued key at once. Loaded values are
+    kept for the rest of the request.
+    """
+
+    def __init__(self, load_many):
+        self.load_many = load_many
+        self.values = {}
+        self.queue = set()
+
+    def queue_keys(self, keys):
+        self.queue.update(key for key in keys if key not in self.values)
+
+    def load(self, key):
+        if key not in self.values:
+            keys = self.queue | {key}
+            self.queue = set()
+            loaded = self.load_many(keys)
+            for queued in keys:
+                self.values[queued] = loaded.get(queued)
+        return self.values[key]
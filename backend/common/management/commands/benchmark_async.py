@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, override_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput of the async and sync read views under concurrent "
+        "requests. Without --url they are served in-process by one ASGI "
+        "handler, which says nothing about a multi-worker deployment; for "
+        "that, start the server the way render.yaml does, once with "
+        "ASYNC_READ_VIEWS=1 and once with ASYNC_READ_VIEWS=0, and pass --url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/api/v1/rooms/")
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument(
+            "--url",
+            help="Base URL of a running server, e.g. http://127.0.0.1:8000",
+        )
+
+    async def run(self, path, requests, concurrency):
+        client = AsyncClient()
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(path)
+        statuses = []
+
+        async def worker():
+            while not queue.empty():
+                response = await client.get(queue.get_nowait())
+                statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started, statuses
+
+    def run_http(self, url, requests_count, concurrency):
+        # One keep-alive session per client thread.
+        local = threading.local()
+
+        def get(_):
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            return local.session.get(url).status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            statuses = list(executor.map(get, range(requests_count)))
+        return time.perf_counter() - started, statuses
+
+    def report(self, name, seconds, statuses):
+        errors = sum(1 for status in statuses if status >= 400)
+        self.stdout.write(
+            f"{name:>5}: {len(statuses) / seconds:8.1f} req/s  "
+            f"{seconds * 1000 / len(statuses):6.2f} ms/req  {errors} errors"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"GET {options['path']} x {options['requests']}, "
+            f"{options['concurrency']} concurrent"
+        )
+        if options["url"]:
+            url = options["url"].rstrip("/") + options["path"]
+            seconds, statuses = self.run_http(
+                url, options["requests"], options["concurrency"]
+            )
+            self.report("server", seconds, statuses)
+            return
+
+        for name, enabled in (("sync", False), ("async", True)):
+            with override_settings(ASYNC_READ_VIEWS=enabled, ALLOWED_HOSTS=["*"]):
+                seconds, statuses = asyncio.run(
+                    self.run(
+                        options["path"],
+                        options["requests"],
+                        options["concurrency"],
+                    )
+                )
+            self.report(name, seconds, statuses)
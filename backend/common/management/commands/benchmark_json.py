@@ -0,0 +1,67 @@
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from config.renderers import ORJSONRenderer
+
+
+def room_payloads(count, seed):
+    """Dicts shaped like RoomListSerializer output, without touching the DB"""
+
+    rng = random.Random(seed)
+    cities = ["서울", "부산", "제주", "Tokyo", "Paris", "New York"]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "pk": pk,
+            "name": f"Room {pk} near the {rng.choice(['sea', 'station', '공원'])}",
+            "country": "한국",
+            "city": rng.choice(cities),
+            "price": rng.randint(10, 1000) * 1000,
+            "rating": round(rng.uniform(0, 5), 2),
+            "is_owner": False,
+            "created_at": start + timedelta(minutes=pk),
+            "photos": [
+                {
+                    "pk": pk * 10 + i,
+                    "file": f"https://imagedelivery.net/{rng.getrandbits(64):x}/public",
+                    "description": "Photo",
+                }
+                for i in range(rng.randint(1, 5))
+            ],
+        }
+        for pk in range(1, count + 1)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Compare encode time and peak memory of the JSON renderers"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=50_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def measure(self, renderer, data, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = renderer.render(data)
+            timings.append(time.perf_counter() - started)
+        tracemalloc.start()
+        renderer.render(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return min(timings), peak, len(output)
+
+    def handle(self, *args, **options):
+        data = room_payloads(options["rooms"], options["seed"])
+        self.stdout.write(f"{len(data)} rooms, best of {options['repeat']}")
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            seconds, peak, size = self.measure(renderer, data, options["repeat"])
+            self.stdout.write(
+                f"{type(renderer).__name__:>16}: {seconds * 1000:8.1f} ms  "
+                f"peak {peak / 2**20:6.1f} MiB  output {size / 2**20:6.1f} MiB"
+            )
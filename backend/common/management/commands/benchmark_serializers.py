@@ -0,0 +1,51 @@
+import time
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+from rooms.models import Room
+from rooms.serializers import RoomListSerializer, room_list_data
+
+
+class Command(BaseCommand):
+    help = "Compare per-row cost of RoomListSerializer and room_list_data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rooms", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def measure(self, build, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            build()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    def handle(self, *args, **options):
+        request = APIRequestFactory().get("/api/v1/rooms/")
+        request.user = AnonymousUser()
+        rooms = Room.objects.order_by("-created_at", "-pk")[: options["rooms"]]
+        count = rooms.count()
+        if not count:
+            raise CommandError("No rooms to serialize, create some first")
+
+        def serializer():
+            return RoomListSerializer(
+                rooms.prefetch_related("photos"),
+                many=True,
+                context={"request": request},
+            ).data
+
+        def fast_path():
+            return room_list_data(list(rooms.for_list()), request)
+
+        self.stdout.write(f"{count} rooms, best of {options['repeat']}")
+        for name, build in (
+            ("RoomListSerializer", serializer),
+            ("room_list_data", fast_path),
+        ):
+            seconds = self.measure(build, options["repeat"])
+            self.stdout.write(
+                f"{name:>18}: {seconds * 1000:8.1f} ms  "
+                f"{seconds / count * 1e6:6.1f} us/row"
+            )
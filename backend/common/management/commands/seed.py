@@ -0,0 +1,371 @@
+import random
+import time
+from datetime import date, timedelta
+from io import StringIO
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from bookings.models import Booking
+from categories.models import Category
+from direct_messages.models import ChattingRoom, Message
+from experiences.models import Experience, Perk
+from medias.models import Photo
+from reviews.models import Review
+from rooms.models import Amenity, Room
+from users.models import User
+from wishlists.models import Wishlist
+
+CITIES = [
+    ("한국", "서울"),
+    ("한국", "부산"),
+    ("한국", "제주"),
+    ("한국", "강릉"),
+    ("한국", "경주"),
+    ("日本", "東京"),
+    ("日本", "大阪"),
+    ("USA", "New York"),
+    ("USA", "Los Angeles"),
+    ("France", "Paris"),
+]
+
+WORDS = (
+    "cozy quiet sunny modern rustic spacious bright charming hidden central "
+    "garden ocean mountain river city loft cabin studio villa hanok"
+).split()
+
+
+def batched(objects, size):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def spread(total, count):
+    """How many of total each of count parents gets, as evenly as possible"""
+
+    if not count:
+        return []
+    share, extra = divmod(total, count)
+    return [share + (i < extra) for i in range(count)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a synthetic data set for load tests and "
+        "benchmarks; the same --seed always generates the same rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--hosts", type=float, default=0.1)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--amenities", type=int, default=30)
+        parser.add_argument("--perks", type=int, default=20)
+        parser.add_argument("--rooms", type=int, default=1000)
+        parser.add_argument("--experiences", type=int, default=200)
+        parser.add_argument("--bookings", type=int, default=10000)
+        parser.add_argument("--reviews", type=int, default=5000)
+        parser.add_argument("--photos", type=int, default=3)
+        parser.add_argument("--wishlists", type=int, default=500)
+        parser.add_argument("--chats", type=int, default=200)
+        parser.add_argument("--messages", type=int, default=2000)
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            help="Day the bookings are laid out around, today by default",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options["seed"])
+        self.prefix = f"seed{options['seed']}_"
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise CommandError(f"Seed {options['seed']} is already loaded")
+        if options["users"] < 1 and (options["rooms"] or options["experiences"]):
+            raise CommandError("Rooms and experiences need at least one user")
+
+        self.host_count = max(1, int(options["users"] * options["hosts"]))
+        started = time.perf_counter()
+        with transaction.atomic():
+            users = self.step("users", self.create_users)
+            hosts = users[: self.host_count]
+            room_categories, experience_categories = self.step(
+                "categories", self.create_categories
+            )
+            amenities = self.step("amenities", self.create_amenities)
+            perks = self.step("perks", self.create_perks)
+            rooms = self.step(
+                "rooms", self.create_rooms, hosts, room_categories, amenities
+            )
+            experiences = self.step(
+                "experiences",
+                self.create_experiences,
+                hosts,
+                experience_categories,
+                perks,
+            )
+            self.step("bookings", self.create_bookings, users, rooms)
+            self.step("reviews", self.create_reviews, users, rooms, experiences)
+            self.step("photos", self.create_photos, rooms, experiences)
+            self.step("wishlists", self.create_wishlists, users, rooms, experiences)
+            self.step("messages", self.create_messages, users)
+            call_command("rebuild_ratings", stdout=StringIO())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded in {time.perf_counter() - started:.1f}s "
+                f"(seed {options['seed']})"
+            )
+        )
+
+    def step(self, name, create, *args):
+        started = time.perf_counter()
+        result = create(*args)
+        count = len(result) if isinstance(result, list) else result
+        if isinstance(result, tuple):
+            count = sum(len(part) for part in result)
+        self.stdout.write(
+            f"{name:>12}: {count:>9} in {time.perf_counter() - started:6.1f}s"
+        )
+        return result
+
+    def insert(self, model, objects, keep_pks=True):
+        """bulk_create() in batches.
+
+        Returns the pks of the rows in order, or only their count for
+        tables too big to keep the pks of in memory.
+        """
+
+        pks = []
+        count = 0
+        for batch in batched(objects, self.options["batch_size"]):
+            created = model.objects.bulk_create(batch)
+            count += len(created)
+            if keep_pks:
+                pks.extend(obj.pk for obj in created)
+        return pks if keep_pks else count
+
+    def words(self, count):
+        return " ".join(self.random.choice(WORDS) for _ in range(count))
+
+    def create_users(self):
+        # Hashing is slow on purpose, so every user shares one password.
+        password = make_password("seed")
+        return self.insert(
+            User,
+            (
+                User(
+                    username=f"{self.prefix}{i}",
+                    password=password,
+                    name=self.words(2).title(),
+                    email=f"{self.prefix}{i}@example.com",
+                    is_host=i < self.host_count,
+                    gender=self.random.choice(User.GenderChoices.values),
+                    language=self.random.choice(User.LanguageChoices.values),
+                    currency=self.random.choice(User.CurrencyChoices.values),
+                )
+                for i in range(self.options["users"])
+            ),
+        )
+
+    def create_categories(self):
+        kinds = Category.CategoryKindChoices
+        categories = [
+            Category(name=f"{self.words(1).title()} {i}", kind=kind)
+            for kind in (kinds.ROOMS, kinds.EXPERIENCES)
+            for i in range(self.options["categories"])
+        ]
+        pks = self.insert(Category, categories)
+        return pks[: len(pks) // 2], pks[len(pks) // 2 :]
+
+    def create_amenities(self):
+        return self.insert(
+            Amenity,
+            (
+                Amenity(name=f"{self.words(1).title()} {i}", description=self.words(4))
+                for i in range(self.options["amenities"])
+            ),
+        )
+
+    def create_perks(self):
+        return self.insert(
+            Perk,
+            (
+                Perk(name=f"{self.words(1).title()} {i}", detail=self.words(4))
+                for i in range(self.options["perks"])
+            ),
+        )
+
+    def create_rooms(self, hosts, categories, amenities):
+        def rooms():
+            for i in range(self.options["rooms"]):
+                country, city = self.random.choice(CITIES)
+                yield Room(
+                    name=f"{self.words(3).title()} {i}",
+                    country=country,
+                    city=city,
+                    price=self.random.randint(20, 500) * 1000,
+                    rooms=self.random.randint(1, 5),
+                    max_guests=self.random.randint(1, 10),
+                    toilets=self.random.randint(1, 3),
+                    description=self.words(30),
+                    address=f"{self.random.randint(1, 999)} {self.words(2).title()}",
+                    pet_friendly=self.random.random() < 0.5,
+                    kind=self.random.choice(Room.RoomKindChoices.values),
+                    owner_id=self.random.choice(hosts),
+                    category_id=self.random.choice(categories) if categories else None,
+                )
+
+        pks = self.insert(Room, rooms())
+        self.link(Room.amenities.through, "room_id", "amenity_id", pks, amenities, 10)
+        return pks
+
+    def create_experiences(self, hosts, categories, perks):
+        def experiences():
+            for i in range(self.options["experiences"]):
+                country, city = self.random.choice(CITIES)
+                start = self.random.randint(8, 18)
+                yield Experience(
+                    name=f"{self.words(3).title()} {i}",
+                    country=country,
+                    city=city,
+                    host_id=self.random.choice(hosts),
+                    price=self.random.randint(10, 200) * 1000,
+                    address=f"{self.random.randint(1, 999)} {self.words(2).title()}",
+                    start=f"{start:02}:00",
+                    end=f"{start + self.random.randint(1, 4):02}:00",
+                    description=self.words(30),
+                    category_id=self.random.choice(categories) if categories else None,
+                )
+
+        pks = self.insert(Experience, experiences())
+        self.link(Experience.perks.through, "experience_id", "perk_id", pks, perks, 5)
+        return pks
+
+    def link(self, through, field, other_field, pks, others, most):
+        """Up to most random others for each of pks, in a through table"""
+
+        self.insert(
+            through,
+            (
+                through(**{field: pk, other_field: other})
+                for pk in pks
+                for other in self.random.sample(
+                    others, self.random.randint(0, min(most, len(others)))
+                )
+            ),
+            keep_pks=False,
+        )
+
+    def create_bookings(self, users, rooms):
+        """Room bookings that never overlap on the same room.
+
+        Each room's stays follow each other from half a year before --start,
+        with at least one free day in between.
+        """
+
+        start = self.options["start"] or timezone.localdate()
+
+        def bookings():
+            for room, count in zip(rooms, spread(self.options["bookings"], len(rooms))):
+                day = start - timedelta(days=180)
+                for _ in range(count):
+                    check_in = day + timedelta(days=self.random.randint(1, 10))
+                    check_out = check_in + timedelta(days=self.random.randint(1, 7))
+                    day = check_out
+                    yield Booking(
+                        kind=Booking.BookingKindChoices.ROOM,
+                        user_id=self.random.choice(users),
+                        room_id=room,
+                        check_in=check_in,
+                        check_out=check_out,
+                        guests=self.random.randint(1, 4),
+                    )
+
+        return self.insert(Booking, bookings(), keep_pks=False)
+
+    def create_reviews(self, users, rooms, experiences):
+        def reviews():
+            for i in range(self.options["reviews"]):
+                # Rooms get three reviews out of four.
+                on_room = rooms and (not experiences or i % 4)
+                yield Review(
+                    user_id=self.random.choice(users),
+                    room_id=self.random.choice(rooms) if on_room else None,
+                    experience_id=None if on_room else self.random.choice(experiences),
+                    payload=self.words(12),
+                    rating=self.random.choices(range(1, 6), (1, 1, 3, 8, 12))[0],
+                )
+
+        if not (users and (rooms or experiences)):
+            return 0
+        return self.insert(Review, reviews(), keep_pks=False)
+
+    def create_photos(self, rooms, experiences):
+        def photos():
+            for field, pks in (("room_id", rooms), ("experience_id", experiences)):
+                for pk in pks:
+                    for position in range(self.options["photos"]):
+                        yield Photo(
+                            file=f"https://picsum.photos/seed/{field}{pk}-{position}/800/600",
+                            description=self.words(4),
+                            position=position,
+                            **{field: pk},
+                        )
+
+        return self.insert(Photo, photos(), keep_pks=False)
+
+    def create_wishlists(self, users, rooms, experiences):
+        pks = self.insert(
+            Wishlist,
+            (
+                Wishlist(name=self.words(2).title(), user_id=self.random.choice(users))
+                for _ in range(self.options["wishlists"] if users else 0)
+            ),
+        )
+        self.link(Wishlist.rooms.through, "wishlist_id", "room_id", pks, rooms, 10)
+        self.link(
+            Wishlist.experiences.through,
+            "wishlist_id",
+            "experience_id",
+            pks,
+            experiences,
+            5,
+        )
+        return pks
+
+    def create_messages(self, users):
+        if len(users) < 2:
+            return 0
+        chats = self.insert(
+            ChattingRoom, (ChattingRoom() for _ in range(self.options["chats"]))
+        )
+        members = {chat: self.random.sample(users, 2) for chat in chats}
+        self.insert(
+            ChattingRoom.users.through,
+            (
+                ChattingRoom.users.through(chattingroom_id=chat, user_id=user)
+                for chat, pair in members.items()
+                for user in pair
+            ),
+            keep_pks=False,
+        )
+
+        def messages():
+            for chat, count in zip(chats, spread(self.options["messages"], len(chats))):
+                for _ in range(count):
+                    yield Message(
+                        text=self.words(self.random.randint(1, 15)),
+                        user_id=self.random.choice(members[chat]),
+                        room_id=chat,
+                    )
+
+        return self.insert(Message, messages(), keep_pks=False)
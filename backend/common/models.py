@@ -1,6 +1,12 @@
 from django.db import models
 
 
+def average_rating(rating_sum, review_count):
+    if review_count == 0:
+        return 0
+    return round(rating_sum / review_count, 2)
+
+
 class CommonModel(models.Model):
     """Common Model Definition"""
 
@@ -0,0 +1,91 @@
+import base64
+import json
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ParseError
+
+
+def encode_cursor(obj):
+    if isinstance(obj, dict):
+        position = [obj["created_at"].isoformat(), obj["pk"]]
+    else:
+        position = [obj.created_at.isoformat(), obj.pk]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, TypeError):
+        raise ParseError("Invalid cursor")
+    if created_at is None:
+        raise ParseError("Invalid cursor")
+    return created_at, pk
+
+
+def bound_page_size(page_size):
+    return max(1, min(page_size, settings.MAX_PAGE_SIZE))
+
+
+def get_page_size(request, default):
+    try:
+        page_size = int(request.query_params.get("page_size", default))
+    except ValueError:
+        page_size = default
+    return bound_page_size(page_size)
+
+
+def get_page_params(request, page_size=None):
+    """The cursor and bounded page size a request asks for"""
+    return (
+        request.query_params.get("cursor"),
+        get_page_size(request, page_size or settings.PAGE_SIZE),
+    )
+
+
+def page_queryset(queryset, cursor=None, page_size=None):
+    """The rows of one page plus the first row of the next one, unevaluated"""
+
+    page_size = page_size or settings.PAGE_SIZE
+    queryset = queryset.order_by("-created_at", "-pk")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+        )
+    return queryset[: page_size + 1]
+
+
+def paginate_queryset(queryset, cursor=None, page_size=None):
+    """Keyset pagination over (created_at, pk), newest first.
+
+    Returns the objects of the page and the cursor of the next one, or None
+    when this is the last page.
+    """
+
+    page_size = page_size or settings.PAGE_SIZE
+    return split_page(list(page_queryset(queryset, cursor, page_size)), page_size)
+
+
+def split_page(objects, page_size):
+    """A page and the next cursor, from the rows of page_queryset()"""
+
+    next_cursor = None
+    if len(objects) > page_size:
+        objects = objects[:page_size]
+        next_cursor = encode_cursor(objects[-1])
+    return objects, next_cursor
+
+
+def paginate(request, queryset, page_size=None):
+    cursor, page_size = get_page_params(request, page_size)
+    return paginate_queryset(queryset, cursor=cursor, page_size=page_size)
+
+
+async def apaginate(request, queryset, page_size=None):
+    cursor, page_size = get_page_params(request, page_size)
+    page = page_queryset(queryset, cursor, page_size)
+    return split_page([obj async for obj in page], page_size)
@@ -0,0 +1,86 @@
+from rest_framework.exceptions import ParseError
+
+
+class SparseFieldsSerializerMixin:
+    """Serializer that can be pruned to a subset of its fields.
+
+    Nested relations are listed in `expandable` as "select" or "prefetch",
+    so load_queryset() only joins or prefetches the ones that are rendered.
+    """
+
+    expandable = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def load_queryset(cls, queryset, fields=None):
+        for name, how in cls.expandable.items():
+            if fields is not None and name not in fields:
+                continue
+            if how == "select":
+                queryset = queryset.select_related(name)
+            else:
+                queryset = queryset.prefetch_related(name)
+        return queryset
+
+
+def sparse_key(fields):
+    """A string telling apart the representations of get_sparse_fields()"""
+
+    return None if fields is None else ",".join(fields)
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def get_sparse_fields(request, serializer_class):
+    """The fields a request asks for with ?fields= and ?expand=.
+
+    fields= picks the top-level keys, expand= picks which nested relations
+    are rendered (all of them when it is missing). Returns None when neither
+    is given, so the full representation is used.
+    """
+
+    requested = request.query_params.get("fields")
+    expand = request.query_params.get("expand")
+    if requested is None and expand is None:
+        return None
+
+    available = list(serializer_class().fields)
+    fields = set(available)
+    if requested is not None:
+        fields = set(parse_names(requested))
+        unknown = fields - set(available)
+        if unknown:
+            raise ParseError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if expand is not None:
+        expand = set(parse_names(expand))
+        unknown = expand - set(serializer_class.expandable)
+        if unknown:
+            raise ParseError(f"Cannot expand: {', '.join(sorted(unknown))}")
+        fields -= set(serializer_class.expandable) - expand
+    return tuple(name for name in available if name in fields)
+
+
+def resolve_related(queryset, pks, label):
+    """Check many-to-many ids of a write with one query.
+
+    Returns the set of pks, ready for serializer.save() or manager.set(),
+    which only inserts and deletes the difference. Unknown ids are all
+    named in the ParseError.
+    """
+
+    try:
+        pks = {int(pk) for pk in pks or []}
+    except (TypeError, ValueError):
+        raise ParseError(f"Invalid {label.lower()} ids")
+    found = set(queryset.filter(pk__in=pks).values_list("pk", flat=True))
+    missing = sorted(pks - found)
+    if missing:
+        raise ParseError(f"{label} not found: {', '.join(map(str, missing))}")
+    return pks
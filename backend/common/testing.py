@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeUpstream:
+    """A local HTTP server standing in for an external API in tests.
+
+    routes maps (method, path) to a function taking the recorded request
+    (method, path, query, headers, body, client_port) and returning
+    (status, json data) or (status, json data, delay in seconds).
+
+        with FakeUpstream({("GET", "/user"): lambda r: (200, {"id": 1})}) as fake:
+            requests.get(f"{fake.url}/user")
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle_request(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                request = {
+                    "method": self.command,
+                    "path": url.path,
+                    "query": parse_qs(url.query),
+                    "headers": dict(self.headers),
+                    "body": self.rfile.read(length).decode(),
+                    "client_port": self.client_address[1],
+                    "started": time.monotonic(),
+                }
+                with upstream.lock:
+                    upstream.requests.append(request)
+                route = upstream.routes.get((self.command, url.path))
+                status, data, delay = (
+                    (*route(request), 0)[:3] if route else (404, {}, 0)
+                )
+                time.sleep(delay)
+                body = json.dumps(data).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client timed out and went away.
+                    self.close_connection = True
+
+            do_GET = do_POST = handle_request
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def calls(self, path):
+        return [request for request in self.requests if request["path"] == path]
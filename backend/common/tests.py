@@ -1,3 +1,307 @@
-from django.test import TestCase
+import datetime
+import hashlib
+import json
+import tempfile
+import requests
+from decimal import Decimal
+from io import StringIO
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from strawberry.extensions import ParserCache
+from config.parsers import ORJSONParser
+from config.persisted_queries import persisted_query_key
+from config.renderers import ORJSONRenderer
+from config.schema import schema
+from bookings.models import Booking
+from categories.models import Category
+from direct_messages.models import ChattingRoom, Message
+from experiences.models import Perk
+from reviews.models import Review
+from rooms.models import Amenity, Room
+from users.models import User
+from .checks import check_shared_cache
+from .http import CircuitOpen, HTTPClient
+from .testing import FakeUpstream
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+
+class TestORJSON(SimpleTestCase):
+
+    DATA = {
+        "name": "방\u2028room",
+        "price": Decimal("12.50"),
+        "lazy": gettext_lazy("Rooms"),
+        "created_at": datetime.datetime(
+            2030, 1, 1, 9, 30, tzinfo=datetime.timezone.utc
+        ),
+        "local": timezone.localtime(
+            datetime.datetime(2030, 1, 1, 9, 30, 15, 120, tzinfo=datetime.timezone.utc)
+        ),
+        "check_in": datetime.date(2030, 1, 1),
+        "start": datetime.time(9, 30),
+        "nested": [{"pk": 1, "ok": True, "none": None, 1: 2.5}],
+    }
+
+    def test_same_output_as_json_renderer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.DATA),
+            JSONRenderer().render(self.DATA),
+        )
+
+    def test_big_integers_fall_back(self):
+        data = {"big": 2**70, "negative": -(2**64)}
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
+
+    def test_floats_keep_their_value(self):
+        data = {"values": [1e16, 1.5e-7, 0.1, 123456789.125]}
+        self.assertEqual(ORJSONRenderer().render({"big": 1e16}), b'{"big":1e16}')
+        self.assertEqual(
+            json.loads(ORJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_indent_falls_back(self):
+        self.assertEqual(
+            ORJSONRenderer().render(self.DATA, "application/json; indent=4"),
+            JSONRenderer().render(self.DATA, "application/json; indent=4"),
+        )
+
+    def test_parser(self):
+        parsed = ORJSONParser().parse(BytesIO('{"name": "방", "n": [1, 2.5]}'.encode()))
+        self.assertEqual(parsed, {"name": "방", "n": [1, 2.5]})
+
+
+class TestPersistedQueries(APITestCase):
+
+    QUERY = "{ allRooms { edges { node { id } } } }"
+
+    def setUp(self):
+        cache.clear()
+        caches["persisted_queries"].clear()
+        self.extensions = {
+            "persistedQuery": {
+                "version": 1,
+                "sha256Hash": hashlib.sha256(self.QUERY.encode()).hexdigest(),
+            }
+        }
+
+    def post(self, **data):
+        return self.client.post(
+            "/graphql",
+            {"extensions": self.extensions, **data},
+            format="json",
+        )
+
+    def test_hash_only_after_registration(self):
+        response = self.post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["errors"][0]["extensions"]["code"],
+            "PERSISTED_QUERY_NOT_FOUND",
+        )
+
+        response = self.post(query=self.QUERY)
+        self.assertEqual(response.json(), {"data": {"allRooms": {"edges": []}}})
+
+        parser_cache = next(
+            extension
+            for extension in schema.extensions
+            if isinstance(extension, ParserCache)
+        )
+        hits = parser_cache.cached_parse_document.cache_info().hits
+        self.assertEqual(
+            self.post().json(),
+            {"data": {"allRooms": {"edges": []}}},
+        )
+        response = self.client.get(
+            "/graphql",
+            {"extensions": json.dumps(self.extensions)},
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.json(), {"data": {"allRooms": {"edges": []}}})
+        self.assertEqual(parser_cache.cached_parse_document.cache_info().hits, hits + 2)
+
+    def test_hash_mismatch(self):
+        response = self.post(query="{ room(pk: 1) { id } }")
+        self.assertEqual(response.status_code, 400)
+
+    def test_kept_out_of_default_cache(self):
+        self.post(query=self.QUERY)
+        self.assertIsNone(cache.get(persisted_query_key(self.hash())))
+        self.assertEqual(
+            caches["persisted_queries"].get(persisted_query_key(self.hash())),
+            self.QUERY,
+        )
+
+    def test_manifest(self):
+        other = "{ allRooms { edges { node { name } } } }"
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as manifest:
+            json.dump({self.hash(): self.QUERY}, manifest)
+            manifest.flush()
+            with self.settings(GRAPHQL_PERSISTED_QUERIES_FILE=manifest.name):
+                self.assertEqual(
+                    self.post().json(), {"data": {"allRooms": {"edges": []}}}
+                )
+
+                # Queries outside the manifest run but are never stored.
+                self.extensions["persistedQuery"]["sha256Hash"] = self.hash(other)
+                self.assertEqual(
+                    self.post(query=other).json(),
+                    {"data": {"allRooms": {"edges": []}}},
+                )
+                response = self.post()
+                self.assertEqual(
+                    response.json()["errors"][0]["extensions"]["code"],
+                    "PERSISTED_QUERY_NOT_FOUND",
+                )
+
+    def hash(self, query=None):
+        return hashlib.sha256((query or self.QUERY).encode()).hexdigest()
+
+
+class TestSharedCacheCheck(SimpleTestCase):
+
+    LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    DBCACHE = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+        }
+    }
+
+    def errors(self, caches, workers):
+        with override_settings(CACHES=caches), mock.patch.dict(
+            "os.environ", {"WEB_CONCURRENCY": workers}
+        ):
+            return [error.id for error in check_shared_cache(None)]
+
+    def test_locmem_with_workers(self):
+        self.assertEqual(self.errors(self.LOCMEM, "4"), ["common.E001"])
+
+    def test_locmem_single_process(self):
+        self.assertEqual(self.errors(self.LOCMEM, "1"), [])
+
+    def test_shared_cache(self):
+        self.assertEqual(self.errors(self.DBCACHE, "4"), [])
+
+
+class TestHTTPClient(SimpleTestCase):
+
+    def make_client(self, retries=0, timeout=(1, 1)):
+        return HTTPClient(
+            timeout=timeout,
+            retries=retries,
+            backoff=0,
+            pool_size=2,
+            breaker_threshold=3,
+            breaker_reset=60,
+        )
+
+    def test_keep_alive_and_retries(self):
+        statuses = [503, 200, 200]
+        routes = {("GET", "/flaky"): lambda request: (statuses.pop(0), {})}
+        with FakeUpstream(routes) as fake:
+            client = self.make_client(retries=2)
+            self.assertEqual(client.get(f"{fake.url}/flaky").status_code, 200)
+            self.assertEqual(client.get(f"{fake.url}/flaky").status_code, 200)
+        calls = fake.calls("/flaky")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len({call["client_port"] for call in calls}), 1)
+
+    def test_timeout(self):
+        routes = {("GET", "/slow"): lambda request: (200, {}, 0.5)}
+        with FakeUpstream(routes) as fake:
+            client = self.make_client(timeout=(1, 0.1))
+            with self.assertRaises(requests.Timeout):
+                client.get(f"{fake.url}/slow")
+
+    def test_circuit_breaker(self):
+        routes = {("GET", "/down"): lambda request: (500, {})}
+        with FakeUpstream(routes) as fake:
+            client = self.make_client()
+            for _ in range(3):
+                self.assertEqual(client.get(f"{fake.url}/down").status_code, 500)
+            with self.assertRaises(CircuitOpen):
+                client.get(f"{fake.url}/down")
+            self.assertEqual(len(fake.calls("/down")), 3)
+
+            breaker = client.breaker(fake.url)
+            breaker.opened_at -= 60
+            routes[("GET", "/down")] = lambda request: (200, {})
+            self.assertEqual(client.get(f"{fake.url}/down").status_code, 200)
+            self.assertIsNone(breaker.opened_at)
+
+
+class TestSeed(APITestCase):
+
+    OPTIONS = {
+        "users": 20,
+        "rooms": 15,
+        "experiences": 5,
+        "bookings": 100,
+        "reviews": 40,
+        "wishlists": 5,
+        "chats": 3,
+        "messages": 12,
+        "start": datetime.date(2030, 1, 1),
+        "batch_size": 7,
+        "stdout": StringIO(),
+    }
+
+    def snapshot(self):
+        return {
+            "rooms": list(
+                Room.objects.order_by("pk").values_list(
+                    "name", "city", "price", "owner__username", "review_count"
+                )
+            ),
+            "bookings": list(
+                Booking.objects.order_by("pk").values_list(
+                    "room__name", "user__username", "check_in", "check_out"
+                )
+            ),
+            "messages": list(Message.objects.order_by("pk").values_list("text")),
+        }
+
+    def test_deterministic(self):
+        call_command("seed", **self.OPTIONS)
+        first = self.snapshot()
+        self.assertEqual(len(first["rooms"]), 15)
+        self.assertEqual(len(first["bookings"]), 100)
+        self.assertEqual(len(first["messages"]), 12)
+        self.assertEqual(Review.objects.count(), 40)
+        self.assertEqual(
+            sum(review_count for *_, review_count in first["rooms"]),
+            Review.objects.filter(room__isnull=False).count(),
+        )
+        with self.assertRaises(CommandError):
+            call_command("seed", **self.OPTIONS)
+
+        for model in (User, Category, Amenity, Perk, ChattingRoom):
+            model.objects.all().delete()
+        call_command("seed", **self.OPTIONS)
+        self.assertEqual(self.snapshot(), first)
+        call_command("seed", seed=1, **self.OPTIONS)
+        self.assertEqual(Room.objects.count(), 30)
+
+    def test_bookings_do_not_overlap(self):
+        call_command("seed", **self.OPTIONS)
+        for room in Room.objects.all():
+            for booking in room.bookings.all():
+                self.assertFalse(
+                    Booking.objects.overlapping(
+                        room, booking.check_in, booking.check_out
+                    )
+                    .exclude(pk=booking.pk)
+                    .exists()
+                )
@@ -0,0 +1,37 @@
+import typing
+import strawberry
+from .pagination import encode_cursor
+
+T = typing.TypeVar("T")
+
+
+@strawberry.type
+class PageInfo:
+    has_next_page: bool
+    end_cursor: typing.Optional[str]
+
+
+@strawberry.type
+class Edge(typing.Generic[T]):
+    cursor: str
+    node: T
+
+
+@strawberry.type
+class Connection(typing.Generic[T]):
+    edges: typing.List[Edge[T]]
+    page_info: PageInfo
+
+
+def make_connection(connection_class, objects, next_cursor, **fields):
+    """A Relay style connection of one page from paginate_queryset()"""
+
+    edges = [Edge(cursor=encode_cursor(obj), node=obj) for obj in objects]
+    return connection_class(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=next_cursor is not None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+        **fields,
+    )
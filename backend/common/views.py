@@ -1,3 +1,81 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+from config.authentication import aauthenticate
+from config.renderers import ORJSONRenderer
 
-# Create your views here.
+
+class AsyncReadView(View):
+    """Async GET of an APIView, for the ASGI deployment.
+
+    `async def get()` gets a DRF Request whose user is already
+    authenticated, and returns a Response that is rendered as JSON. Every
+    other method, browsable API and other ?format= requests, and everything when
+    ASYNC_READ_VIEWS is off go to `api_view`, the APIView this mirrors.
+    Read endpoints allow anyone, so there are no permission checks.
+    """
+
+    api_view = None
+    api = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(api=cls.api_view.as_view(), **initkwargs)
+        return csrf_exempt(view)
+
+    def use_api_view(self, request):
+        # ?format= picks a renderer; only JSON is rendered here.
+        format = request.GET.get(api_settings.URL_FORMAT_OVERRIDE)
+        return (
+            not settings.ASYNC_READ_VIEWS
+            or request.method not in ("GET", "HEAD")
+            or "text/html" in request.headers.get("Accept", "")
+            or format not in (None, "json")
+        )
+
+    async def dispatch(self, request, *args, **kwargs):
+        if self.use_api_view(request):
+            return await sync_to_async(self.api)(request, *args, **kwargs)
+
+        authenticators = [
+            authenticator()
+            for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+        ]
+        drf_request = Request(request, authenticators=authenticators)
+        try:
+            drf_request.user, drf_request.auth = await aauthenticate(
+                drf_request,
+                authenticators,
+            ) or (api_settings.UNAUTHENTICATED_USER(), None)
+            response = await self.get(drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(drf_request, authenticators, exc)
+
+        if isinstance(response, Response):
+            response.accepted_renderer = ORJSONRenderer()
+            response.accepted_media_type = ORJSONRenderer.media_type
+            response.renderer_context = {"request": drf_request}
+            response.render()
+        patch_vary_headers(response, ("Accept",))
+        return response
+
+    def handle_exception(self, request, authenticators, exc):
+        if isinstance(exc, (NotAuthenticated, AuthenticationFailed)):
+            # Same as APIView: 401 only when the first authenticator can
+            # say how to authenticate.
+            header = authenticators[0].authenticate_header(request)
+            if header:
+                exc.auth_header = header
+            else:
+                exc.status_code = 403
+        response = exception_handler(exc, {"request": request})
+        if response is None:
+            raise exc
+        return response
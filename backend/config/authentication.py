@@ -1,9 +1,151 @@
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 import jwt
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework import authentication
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from users.models import User
 
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Process-local LRU of authenticated users with a short TTL.
+
+    Keys are whatever identifies the credential (a JWT or a Trust-Me
+    username), so a hit skips both the token verification and the user query.
+    Entries of a user are dropped when that user is saved or deleted; other
+    workers see the change once their entry expires.
+
+    Every report_every seconds the next lookup logs the hit rate, one line
+    per worker since each has its own cache.
+    """
+
+    def __init__(self, max_size, ttl, report_every=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.report_every = report_every
+        self.next_report = time.monotonic() + (report_every or 0)
+
+    def lookup(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                user = entry[1]
+            else:
+                self.misses += 1
+                user = None
+            report = self.report_every and now >= self.next_report
+            if report:
+                self.next_report = now + self.report_every
+        if report:
+            self.report()
+        return user
+
+    def store(self, key, user):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, user)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get(self, key, load_user):
+        user = self.lookup(key)
+        if user is None:
+            user = load_user()
+            self.store(key, user)
+        return copy.copy(user)
+
+    async def aget(self, key, aload_user):
+        user = self.lookup(key)
+        if user is None:
+            user = await aload_user()
+            self.store(key, user)
+        return copy.copy(user)
+
+    def invalidate_user(self, pk):
+        with self.lock:
+            for key in [
+                key for key, (_, user) in self.entries.items() if user.pk == pk
+            ]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0,
+                "size": len(self.entries),
+            }
+
+    def report(self):
+        stats = self.stats()
+        logger.info(
+            "Auth user cache (pid %d): %d hits, %d misses, %.1f%% hit rate, "
+            "%d entries",
+            os.getpid(),
+            stats["hits"],
+            stats["misses"],
+            stats["hit_rate"] * 100,
+            stats["size"],
+        )
+
+
+user_cache = UserCache(
+    max_size=settings.AUTH_USER_CACHE_SIZE,
+    ttl=settings.AUTH_USER_CACHE_TTL,
+    report_every=settings.AUTH_USER_CACHE_REPORT_EVERY,
+)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate_user(instance.pk)
+
+
+class SessionAuthentication(authentication.SessionAuthentication):
+
+    async def aauthenticate(self, request):
+        # Async views only serve safe methods, which DRF exempts from the
+        # CSRF check as well.
+        user = await request._request.auser()
+        if not user or not user.is_active:
+            return None
+        return (user, None)
+
+
+class TokenAuthentication(authentication.TokenAuthentication):
+
+    async def aauthenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        return await sync_to_async(self.authenticate)(request)
+
 
 class TrustMeBroAuthentication(BaseAuthentication):
 
@@ -11,19 +153,32 @@ class TrustMeBroAuthentication(BaseAuthentication):
         username = request.headers.get("Trust-Me")
         if not username:
             return None
-        try:
-            user = User.objects.get(username=username)
-            return (user, None)
-        except User.DoesNotExist:
-            raise AuthenticationFailed(f"No user {username}")
 
+        def load_user():
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise AuthenticationFailed(f"No user {username}")
 
-class JWTAuthentication(BaseAuthentication):
+        return (user_cache.get(("trust-me", username), load_user), None)
 
-    def authenticate(self, request):
-        token = request.headers.get("Jwt")
-        if not token:
+    async def aauthenticate(self, request):
+        username = request.headers.get("Trust-Me")
+        if not username:
             return None
+
+        async def load_user():
+            try:
+                return await User.objects.aget(username=username)
+            except User.DoesNotExist:
+                raise AuthenticationFailed(f"No user {username}")
+
+        return (await user_cache.aget(("trust-me", username), load_user), None)
+
+
+class JWTAuthentication(BaseAuthentication):
+
+    def decode_pk(self, token):
         decoded = jwt.decode(
             token,
             settings.SECRET_KEY,
@@ -32,8 +187,50 @@ class JWTAuthentication(BaseAuthentication):
         pk = decoded.get("pk")
         if not pk:
             raise AuthenticationFailed("Invalid Token")
-        try:
-            user = User.objects.get(pk=pk)
-            return (user, None)
-        except User.DoesNotExist:
-            raise AuthenticationFailed("User Not Found")
+        return pk
+
+    def authenticate(self, request):
+        token = request.headers.get("Jwt")
+        if not token:
+            return None
+
+        def load_user():
+            pk = self.decode_pk(token)
+            try:
+                return User.objects.get(pk=pk)
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User Not Found")
+
+        return (user_cache.get(("jwt", token), load_user), None)
+
+    async def aauthenticate(self, request):
+        token = request.headers.get("Jwt")
+        if not token:
+            return None
+
+        async def load_user():
+            pk = self.decode_pk(token)
+            try:
+                return await User.objects.aget(pk=pk)
+            except User.DoesNotExist:
+                raise AuthenticationFailed("User Not Found")
+
+        return (await user_cache.aget(("jwt", token), load_user), None)
+
+
+async def aauthenticate(request, authenticators):
+    """What DRF's Request.user runs, for async views.
+
+    Authenticators without an aauthenticate() method are run in a thread.
+    Returns the (user, auth) pair of the first one that recognises the
+    request, or None.
+    """
+
+    for authenticator in authenticators:
+        if hasattr(authenticator, "aauthenticate"):
+            result = await authenticator.aauthenticate(request)
+        else:
+            result = await sync_to_async(authenticator.authenticate)(request)
+        if result is not None:
+            return result
+    return None
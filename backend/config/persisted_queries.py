@@ -0,0 +1,61 @@
+import functools
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import caches
+from strawberry.http.exceptions import HTTPException
+
+
+class PersistedQueryNotFound(Exception):
+    pass
+
+
+def persisted_query_key(sha256_hash):
+    return f"graphql:persisted:{sha256_hash}"
+
+
+@functools.cache
+def load_manifest(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def resolve_persisted_query(query, extensions):
+    """The query text of a request using Apollo style persisted queries.
+
+    Clients send {"persistedQuery": {"version": 1, "sha256Hash": ...}} in
+    the extensions, with the query text only the first time, or again after
+    the server answered PersistedQueryNotFound.
+
+    With GRAPHQL_PERSISTED_QUERIES_FILE set, hashes are looked up in that
+    manifest only and query texts are never stored. Otherwise texts are kept
+    in the "persisted_queries" cache, which is bounded and expires them.
+    """
+
+    persisted = (extensions or {}).get("persistedQuery")
+    if not persisted:
+        return query
+    if persisted.get("version") != 1 or not persisted.get("sha256Hash"):
+        raise HTTPException(400, "Unsupported persisted query")
+
+    sha256_hash = persisted["sha256Hash"]
+    if query is not None and hashlib.sha256(query.encode()).hexdigest() != sha256_hash:
+        raise HTTPException(400, "Persisted query hash does not match the query")
+
+    if settings.GRAPHQL_PERSISTED_QUERIES_FILE:
+        manifest = load_manifest(settings.GRAPHQL_PERSISTED_QUERIES_FILE)
+        if query is None:
+            query = manifest.get(sha256_hash)
+            if query is None:
+                raise PersistedQueryNotFound
+        return query
+
+    cache = caches["persisted_queries"]
+    key = persisted_query_key(sha256_hash)
+    if query is None:
+        query = cache.get(key)
+        if query is None:
+            raise PersistedQueryNotFound
+        return query
+    cache.set(key, query)
+    return query
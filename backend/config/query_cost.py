@@ -0,0 +1,87 @@
+from django.conf import settings
+from graphql import GraphQLError, ValidationRule, get_named_type
+from graphql.language import (
+    FieldNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    IntValueNode,
+)
+from common.pagination import bound_page_size
+
+
+class QueryCostRule(ValidationRule):
+    """Rejects operations costing more than GRAPHQL_MAX_COMPLEXITY.
+
+    Every field costs 1, and what is selected under a paginated field (one
+    with a `first` argument) is counted once per item it can return. A
+    `first` given as a variable is counted as MAX_PAGE_SIZE, since variables
+    are not known yet during validation.
+    """
+
+    def enter_operation_definition(self, node, *args):
+        root_type = self.context.schema.get_root_type(node.operation)
+        cost = self.selection_cost(root_type, node.selection_set, frozenset())
+        if cost > settings.GRAPHQL_MAX_COMPLEXITY:
+            self.report_error(
+                GraphQLError(
+                    f"Query costs {cost}, "
+                    f"more than the limit of {settings.GRAPHQL_MAX_COMPLEXITY}",
+                    node,
+                )
+            )
+
+    def selection_cost(self, parent_type, selection_set, fragments):
+        if selection_set is None:
+            return 0
+        cost = 0
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                cost += self.field_cost(parent_type, selection, fragments)
+            elif isinstance(selection, InlineFragmentNode):
+                fragment_type = parent_type
+                if selection.type_condition:
+                    fragment_type = self.context.schema.get_type(
+                        selection.type_condition.name.value
+                    )
+                cost += self.selection_cost(
+                    fragment_type,
+                    selection.selection_set,
+                    fragments,
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.context.get_fragment(name)
+                # Fragment cycles are reported by the NoFragmentCycles rule.
+                if fragment and name not in fragments:
+                    cost += self.selection_cost(
+                        self.context.schema.get_type(
+                            fragment.type_condition.name.value
+                        ),
+                        fragment.selection_set,
+                        fragments | {name},
+                    )
+        return cost
+
+    def field_cost(self, parent_type, node, fragments):
+        field = getattr(parent_type, "fields", {}).get(node.name.value)
+        if field is None:
+            # __typename, or an unknown field reported by other rules
+            return 1
+        return 1 + self.page_size(field, node) * self.selection_cost(
+            get_named_type(field.type),
+            node.selection_set,
+            fragments,
+        )
+
+    def page_size(self, field, node):
+        if "first" not in field.args:
+            return 1
+        for argument in node.arguments:
+            if argument.name.value == "first":
+                if isinstance(argument.value, IntValueNode):
+                    return bound_page_size(int(argument.value.value))
+                return settings.MAX_PAGE_SIZE
+        default = field.args["first"].default_value
+        if isinstance(default, int):
+            return bound_page_size(default)
+        return settings.MAX_PAGE_SIZE
@@ -1,5 +1,97 @@
+import json
 import strawberry
+from dataclasses import dataclass, field
+from functools import partial
+from django.conf import settings
+from graphql import GraphQLError
+from strawberry.extensions import (
+    AddValidationRules,
+    ParserCache,
+    QueryDepthLimiter,
+    ValidationCache,
+)
+from strawberry.django import views
+from strawberry.http.exceptions import HTTPException
+from strawberry.types import ExecutionResult
+from strawberry.django.context import StrawberryDjangoContext
+from common.loaders import BatchLoader
+from users.loaders import load_users
+from reviews.loaders import load_room_reviews
 from rooms import schema as rooms_schema
+from .query_cost import QueryCostRule
+from .persisted_queries import PersistedQueryNotFound, resolve_persisted_query
+
+
+class Loaders:
+    """The batch loaders of one GraphQL request"""
+
+    def __init__(self):
+        self.users = BatchLoader(load_users)
+        self.room_pks = set()
+        self.room_review_pages = {}
+
+    def queue_rooms(self, rooms):
+        """Queue what RoomType resolves for these rooms"""
+
+        self.users.queue_keys(room.owner_id for room in rooms)
+        self.room_pks.update(room.pk for room in rooms)
+        for loader in self.room_review_pages.values():
+            loader.queue_keys(self.room_pks)
+
+    def room_reviews(self, page_size):
+        """Loader of the first page_size reviews of the queued rooms"""
+
+        loader = self.room_review_pages.get(page_size)
+        if loader is None:
+            loader = BatchLoader(partial(load_room_reviews, page_size=page_size))
+            loader.queue_keys(self.room_pks)
+            self.room_review_pages[page_size] = loader
+        return loader
+
+
+@dataclass
+class Context(StrawberryDjangoContext):
+    loaders: Loaders = field(default_factory=Loaders)
+
+
+class GraphQLView(views.GraphQLView):
+
+    def get_context(self, request, response):
+        return Context(request=request, response=response)
+
+    def parse_json(self, data):
+        self.request_data = super().parse_json(data)
+        return self.request_data
+
+    def parse_query_params(self, params):
+        self.request_data = super().parse_query_params(params)
+        return self.request_data
+
+    def parse_http_body(self, request):
+        request_data = super().parse_http_body(request)
+        extensions = getattr(self, "request_data", {}).get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HTTPException(400, "Unable to parse extensions as JSON")
+        request_data.query = resolve_persisted_query(request_data.query, extensions)
+        return request_data
+
+    def execute_operation(self, request, context, root_value):
+        try:
+            return super().execute_operation(request, context, root_value)
+        except PersistedQueryNotFound:
+            # Asks the client to send the query text along with the hash.
+            return ExecutionResult(
+                data=None,
+                errors=[
+                    GraphQLError(
+                        "PersistedQueryNotFound",
+                        extensions={"code": "PERSISTED_QUERY_NOT_FOUND"},
+                    )
+                ],
+            )
 
 
 @strawberry.type
@@ -15,4 +107,11 @@ class Mutation(rooms_schema.Mutation):
 schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
+    extensions=[
+        QueryDepthLimiter(max_depth=settings.GRAPHQL_MAX_DEPTH),
+        AddValidationRules([QueryCostRule]),
+        # Parsed and validated documents of the most used query texts
+        ParserCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+        ValidationCache(maxsize=settings.GRAPHQL_DOCUMENT_CACHE_SIZE),
+    ],
 )
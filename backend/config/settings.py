@@ -107,7 +107,9 @@ WSGI_APPLICATION = "config.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-if DEBUG:
+# DATABASE_URL also points development and test runs at Postgres, which
+# the booking overlap constraint and row locking tests need.
+if DEBUG and "DATABASE_URL" not in os.environ:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
@@ -173,19 +175,110 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "users.User"
 
+# Token/Trust-Me authenticated users are cached per process for this long
+AUTH_USER_CACHE_SIZE = 1024
+
+AUTH_USER_CACHE_TTL = 60
+
+# Seconds between the log lines reporting each worker's hit rate
+AUTH_USER_CACHE_REPORT_EVERY = 60 * 10
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "config.authentication": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 MEDIA_ROOT = "uploads"
 
 MEDIA_URL = "user-uploads/"
 
 PAGE_SIZE = 3
 
+LIST_PAGE_SIZE = 24
+
+MAX_PAGE_SIZE = 100
+
+# GraphQL documents nested deeper or costing more (fields times the page
+# sizes above them) are rejected before execution.
+GRAPHQL_MAX_DEPTH = 10
+
+GRAPHQL_MAX_COMPLEXITY = 1000
+
+GRAPHQL_DOCUMENT_CACHE_SIZE = 256
+
+# Deploy-time manifest of the frontend's persisted queries, a JSON object
+# of sha256 hash to query text. When set, only these hashes are accepted
+# and clients can't register their own.
+GRAPHQL_PERSISTED_QUERIES_FILE = env("GRAPHQL_PERSISTED_QUERIES_FILE", default=None)
+
+# "default" holds the detail payloads and their version counters (see
+# common/cache.py), so every worker has to share it: with a per-process
+# cache a signal's bump only reaches the worker that handled the write, and
+# the others keep serving, and answering 304 for, the old detail. Point
+# CACHE_URL at Redis (rediscache://...) or leave production on the database
+# cache, whose table build.sh creates. locmem is only fine for a single
+# process, i.e. development and tests; common/checks.py refuses it with
+# more than one worker.
+# Without a manifest, registered queries live in their own bounded cache so
+# they can't evict the detail entries and version counters in "default".
+CACHES = {
+    "default": env.cache_url(
+        "CACHE_URL",
+        default="locmemcache://" if DEBUG else "dbcache://django_cache",
+    ),
+    "persisted_queries": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "persisted-queries",
+        "TIMEOUT": 60 * 60 * 24,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+}
+
+# Outbound HTTP (OAuth providers, Cloudflare), see common/http.py.
+# Timeouts are (connect, read) seconds.
+OUTBOUND_HTTP_TIMEOUT = (3.05, 10)
+
+OUTBOUND_HTTP_RETRIES = 2
+
+OUTBOUND_HTTP_BACKOFF = 0.3
+
+OUTBOUND_HTTP_POOL_SIZE = 10
+
+OUTBOUND_HTTP_BREAKER_THRESHOLD = 5
+
+OUTBOUND_HTTP_BREAKER_RESET = 30
+
+# Serve the hottest GET endpoints with async views (see common/views.py).
+# Read from the environment so benchmark_async --url can compare servers
+# started both ways.
+ASYNC_READ_VIEWS = env.bool("ASYNC_READ_VIEWS", default=True)
+
+# Room/experience detail payloads are also invalidated by signals; the
+# timeout only bounds staleness for relations the signals don't watch.
+DETAIL_CACHE_TIMEOUT = 60 * 10
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.SessionAuthentication",
+        "config.authentication.SessionAuthentication",
         "config.authentication.TrustMeBroAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "config.authentication.TokenAuthentication",
         "config.authentication.JWTAuthentication",
-    ]
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 if DEBUG:
@@ -203,6 +296,29 @@ GH_SECRET = env("GH_SECRET")
 CF_ID = env("CF_ID")
 CF_TOKEN = env("CF_TOKEN")
 
+GITHUB_URL = "https://github.com"
+
+GITHUB_API_URL = "https://api.github.com"
+
+KAKAO_AUTH_URL = "https://kauth.kakao.com"
+
+KAKAO_API_URL = "https://kapi.kakao.com"
+
+CLOUDFLARE_API_URL = "https://api.cloudflare.com/client/v4"
+
+# Pre-created Cloudflare upload URLs, see medias/upload_urls.py. Times are
+# seconds; Cloudflare accepts an expiry between 2 minutes and 6 hours.
+UPLOAD_URL_POOL_SIZE = 20
+
+UPLOAD_URL_POOL_REFILL_AT = 5
+
+UPLOAD_URL_TTL = 60 * 60
+
+UPLOAD_URL_MIN_REMAINING = 60 * 10
+
+# Most photos POST .../photos/batch attaches at once.
+PHOTO_BATCH_MAX_SIZE = 50
+
 if not DEBUG:
     SESSION_COOKIE_DOMAIN = ".airbnbclone.xyz"
     CSRF_COOKIE_DOMAIN = ".airbnbclone.xyz"
@@ -19,8 +19,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
-from strawberry.django.views import GraphQLView
-from .schema import schema
+from .schema import GraphQLView, schema
 
 urlpatterns = [
     path("admin/", admin.site.urls),
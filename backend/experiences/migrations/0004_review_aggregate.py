@@ -0,0 +1,26 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "experiences",
+            "0003_alter_experience_category_alter_experience_host_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="experience",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="experience",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
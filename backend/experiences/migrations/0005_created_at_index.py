@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0002_alter_category_options"),
+        ("experiences", "0004_review_aggregate"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="experience",
+            index=models.Index(
+                fields=["created_at", "id"], name="experiences_created_9874c7_idx"
+            ),
+        ),
+    ]
@@ -1,5 +1,20 @@
 from django.db import models
-from common.models import CommonModel
+from common.models import CommonModel, average_rating
+
+
+class ExperienceQuerySet(models.QuerySet):
+
+    def for_list(self):
+        """Rows with just the columns experience_list_data() needs"""
+        return self.values(
+            "pk",
+            "name",
+            "country",
+            "city",
+            "price",
+            "host_id",
+            "created_at",
+        )
 
 
 class Experience(CommonModel):
@@ -39,10 +54,28 @@ class Experience(CommonModel):
         on_delete=models.SET_NULL,
         related_name="experiences",
     )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+
+    objects = ExperienceQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.name
 
+    def rating(experience):
+        return average_rating(experience.rating_sum, experience.review_count)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+        ]
+
 
 class Perk(CommonModel):
     """What is included on an Experience"""
@@ -2,8 +2,14 @@ from rest_framework import serializers
 from .models import Perk, Experience
 from users.serializers import TinyUserSerializer
 from categories.serializers import CategorySerializer
-from medias.serializers import PhotoSerializer, VideoSerializer
-from wishlists.models import Wishlist
+from medias.serializers import (
+    PhotoSerializer,
+    VideoSerializer,
+    photo_data_by,
+    video_files_by,
+)
+from common.serializers import SparseFieldsSerializerMixin
+from wishlists.liked import is_experience_liked
 
 
 class PerkSerializer(serializers.ModelSerializer):
@@ -16,7 +22,18 @@ class PerkSerializer(serializers.ModelSerializer):
         )
 
 
-class ExperienceDetailSerializer(serializers.ModelSerializer):
+class ExperienceDetailSerializer(
+    SparseFieldsSerializerMixin,
+    serializers.ModelSerializer,
+):
+
+    expandable = {
+        "host": "select",
+        "category": "select",
+        "video": "select",
+        "perks": "prefetch",
+        "photos": "prefetch",
+    }
 
     host = TinyUserSerializer(
         read_only=True,
@@ -28,6 +45,7 @@ class ExperienceDetailSerializer(serializers.ModelSerializer):
     category = CategorySerializer(
         read_only=True,
     )
+    rating = serializers.SerializerMethodField()
     is_host = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     photos = PhotoSerializer(
@@ -40,18 +58,22 @@ class ExperienceDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Experience
-        fields = "__all__"
+        exclude = ("rating_sum",)
+
+    def get_rating(self, experience):
+        return experience.rating()
 
     def get_is_host(self, experience):
-        request = self.context["request"]
-        return experience.host == request.user
+        request = self.context.get("request")
+        if request:
+            return experience.host == request.user
+        return False
 
     def get_is_liked(self, experience):
-        request = self.context["request"]
-        return Wishlist.objects.filter(
-            user=request.user,
-            experiences__pk=experience.pk,
-        ).exists()
+        request = self.context.get("request")
+        if request:
+            return is_experience_liked(request, experience)
+        return False
 
 
 class ExperienceListSerializer(serializers.ModelSerializer):
@@ -80,7 +102,38 @@ class ExperienceListSerializer(serializers.ModelSerializer):
 
     def get_is_host(self, experience):
         request = self.context["request"]
-        return experience.host == request.user
+        return experience.host_id == request.user.pk
+
+
+def experience_list_data(experiences, request, photos=None, videos=None):
+    """ExperienceListSerializer(experiences, many=True).data for
+    Experience.objects.for_list() rows, without per-row field objects.
+
+    Async views pass photos and videos they loaded themselves.
+    """
+
+    pks = [experience["pk"] for experience in experiences]
+    if photos is None:
+        photos = photo_data_by("experience_id", pks)
+    if videos is None:
+        videos = video_files_by(pks)
+    return [
+        {
+            "pk": experience["pk"],
+            "name": experience["name"],
+            "country": experience["country"],
+            "city": experience["city"],
+            "price": experience["price"],
+            "is_host": experience["host_id"] == request.user.pk,
+            "photos": photos[experience["pk"]],
+            "video": (
+                {"file": videos[experience["pk"]]}
+                if experience["pk"] in videos
+                else None
+            ),
+        }
+        for experience in experiences
+    ]
 
 
 class SmallExperienceSerializer(serializers.ModelSerializer):
@@ -0,0 +1,64 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from common.cache import bump_version, bump_versions
+from categories.models import Category
+from medias.models import Photo, Video
+from medias.signals import photos_attached
+from .models import Experience, Perk
+
+
+@receiver(post_save, sender=Experience)
+@receiver(post_delete, sender=Experience)
+def experience_changed(sender, instance, **kwargs):
+    bump_version("experience", instance.pk)
+
+
+@receiver(m2m_changed, sender=Experience.perks.through)
+def experience_perks_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        bump_versions("experience", pk_set or [])
+    else:
+        bump_version("experience", instance.pk)
+
+
+@receiver(post_save, sender=Perk)
+@receiver(pre_delete, sender=Perk)
+def perk_changed(sender, instance, **kwargs):
+    bump_versions("experience", instance.experiences.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_versions("experience", instance.experiences.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def experience_child_changed(sender, instance, **kwargs):
+    if instance.experience_id:
+        bump_version("experience", instance.experience_id)
+
+
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+@receiver(post_save, sender=Video)
+@receiver(post_delete, sender=Video)
+def experience_media_changed(sender, instance, **kwargs):
+    # Photos and the video are part of the experience list payload, so they
+    # count as a change to the experience for conditional GETs.
+    if instance.experience_id:
+        Experience.objects.filter(pk=instance.experience_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(photos_attached)
+def experience_photos_attached(sender, field, pk, **kwargs):
+    if field == "experience":
+        bump_version("experience", pk)
+        Experience.objects.filter(pk=pk).update(updated_at=timezone.now())
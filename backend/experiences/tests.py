@@ -1,3 +1,88 @@
-from django.test import TestCase
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory, APITestCase
+from users.models import User
+from medias.models import Photo, Video
+from . import models
+from .serializers import ExperienceListSerializer, experience_list_data
 
-# Create your tests here.
+
+class TestListData(APITestCase):
+
+    def test_experience_list_data(self):
+        user = User.objects.create(username="host")
+        for i in range(3):
+            experience = models.Experience.objects.create(
+                name=f"Experience {i}",
+                host=user if i else User.objects.create(username="other"),
+                price=100,
+                address="address",
+                start="10:00",
+                end="12:00",
+                description="desc",
+            )
+            for j in range(i):
+                Photo.objects.create(
+                    file=f"https://example.com/{i}-{j}.png",
+                    description=f"Photo {j}",
+                    experience=experience,
+                )
+            if i == 2:
+                Video.objects.create(
+                    file="https://example.com/a.mp4",
+                    experience=experience,
+                )
+        request = APIRequestFactory().get("/api/v1/experiences/")
+        request.user = user
+        experiences = models.Experience.objects.order_by("pk")
+        # Compared as the bytes the API responds with.
+        render = api_settings.DEFAULT_RENDERER_CLASSES[0]().render
+        self.assertEqual(
+            render(experience_list_data(list(experiences.for_list()), request)),
+            render(
+                ExperienceListSerializer(
+                    experiences,
+                    many=True,
+                    context={"request": request},
+                ).data
+            ),
+        )
+
+
+class TestDetailConditionalGet(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="host")
+        self.experience = models.Experience.objects.create(
+            name="Experience",
+            host=self.user,
+            price=100,
+            address="address",
+            start="10:00",
+            end="12:00",
+            description="desc",
+        )
+        self.url = f"/api/v1/experiences/{self.experience.pk}"
+
+    def test_fields_change_etag(self):
+        etag = self.client.get(self.url).headers["ETag"]
+        response = self.client.get(
+            self.url,
+            {"fields": "name,is_host"},
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"name": "Experience", "is_host": False})
+
+    def test_viewer_changes_etag(self):
+        etag = self.client.get(self.url).headers["ETag"]
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_host"])
+        response = self.client.get(
+            self.url,
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        self.assertEqual(response.status_code, 304)
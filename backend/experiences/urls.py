@@ -2,11 +2,12 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("", views.Experiences.as_view()),
+    path("", views.AsyncExperiences.as_view()),
     path("<int:pk>", views.ExperienceDetail.as_view()),
     path("<int:pk>/reviews", views.ExperienceReviews.as_view()),
     path("<int:pk>/perks", views.ExperiencePerks.as_view()),
     path("<int:pk>/photos", views.ExperiencePhotos.as_view()),
+    path("<int:pk>/photos/batch", views.ExperiencePhotoBatch.as_view()),
     path("<int:pk>/video", views.ExperienceVideo.as_view()),
     path("<int:pk>/bookings", views.ExperienceBookingList.as_view()),
     path("<int:pk>/bookings/<int:booking_pk>", views.ExperienceBooking.as_view()),
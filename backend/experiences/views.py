@@ -15,6 +15,20 @@ from rest_framework.exceptions import (
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
 
+# pagination, caching and conditional requests
+from common.pagination import apaginate, paginate
+from common.cache import get_cached, get_version
+from common.serializers import get_sparse_fields, resolve_related, sparse_key
+from common.conditional import (
+    aconditional,
+    aggregate_validators,
+    apage_validators,
+    conditional,
+    page_validators,
+)
+from common.views import AsyncReadView
+from wishlists.liked import load_liked
+
 # models
 from .models import Perk, Experience
 from categories.models import Category
@@ -23,11 +37,18 @@ from bookings.models import Booking
 # serializers
 from .serializers import (
     PerkSerializer,
-    ExperienceListSerializer,
     ExperienceDetailSerializer,
+    experience_list_data,
 )
 from reviews.serializers import ReviewSerializer
-from medias.serializers import PhotoSerializer, VideoSerializer
+from medias.photos import attach_photos, next_position
+from medias.serializers import (
+    PhotoBatchSerializer,
+    PhotoSerializer,
+    VideoSerializer,
+    aphoto_data_by,
+    avideo_files_by,
+)
 from bookings.serializers import (
     PublicExperienceBookingSerializer,
     CreateExperienceBookingSerializer,
@@ -36,6 +57,10 @@ from bookings.serializers import (
 
 class Perks(APIView):
 
+    def get_validators(self, request):
+        return aggregate_validators(Perk.objects.all())
+
+    @conditional(get_validators)
     def get(self, request):
         all_perks = Perk.objects.all()
         serializer = PerkSerializer(all_perks, many=True)
@@ -92,14 +117,27 @@ class Experiences(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_validators(self, request):
+        return page_validators(
+            request,
+            Experience.objects.all(),
+            settings.LIST_PAGE_SIZE,
+            request.user.pk,
+        )
+
+    @conditional(get_validators)
     def get(self, request):
-        all_experiences = Experience.objects.all()
-        serializer = ExperienceListSerializer(
-            all_experiences,
-            many=True,
-            context={"request": request},
+        experiences, next_cursor = paginate(
+            request,
+            Experience.objects.for_list(),
+            page_size=settings.LIST_PAGE_SIZE,
+        )
+        return Response(
+            {
+                "results": experience_list_data(experiences, request),
+                "next": next_cursor,
+            }
         )
-        return Response(serializer.data)
 
     def post(self, request):
         serializer = ExperienceDetailSerializer(data=request.data)
@@ -113,25 +151,23 @@ class Experiences(APIView):
                     raise ParseError("Category kind should be 'experiences'")
             except Category.DoesNotExist:
                 raise ParseError("Category not found")
-            try:
-                with transaction.atomic():
-                    experience = serializer.save(
-                        host=request.user,
-                        category=category,
-                    )
-                    perks = request.data.get("perks")
-                    for perk_pk in perks:
-                        perk = Perk.objects.get(pk=perk_pk)
-                        experience.perks.add(perk)
-                    print(experience.perks.all())
-                    return Response(
-                        ExperienceDetailSerializer(
-                            experience,
-                            context={"request": request},
-                        ).data
-                    )
-            except Exception:
-                raise ParseError("Perk not found")
+            perks = resolve_related(
+                Perk.objects.all(),
+                request.data.get("perks"),
+                "Perk",
+            )
+            with transaction.atomic():
+                experience = serializer.save(
+                    host=request.user,
+                    category=category,
+                    perks=perks,
+                )
+            return Response(
+                ExperienceDetailSerializer(
+                    experience,
+                    context={"request": request},
+                ).data
+            )
         else:
             return Response(
                 serializer.errors,
@@ -149,13 +185,54 @@ class ExperienceDetail(APIView):
         except Experience.DoesNotExist:
             raise NotFound
 
+    def build_detail(self, pk, fields=None):
+        experiences = ExperienceDetailSerializer.load_queryset(
+            Experience.objects.all(),
+            fields,
+        )
+        try:
+            experience = experiences.get(pk=pk)
+        except Experience.DoesNotExist:
+            raise NotFound
+        return {
+            "host_id": experience.host_id,
+            "data": ExperienceDetailSerializer(experience, fields=fields).data,
+        }
+
+    @staticmethod
+    def make_etag(request, pk, version, liked):
+        fields = get_sparse_fields(request, ExperienceDetailSerializer)
+        return (
+            f"experience-{pk}-{version}:{request.user.pk}:{liked}:{sparse_key(fields)}"
+        )
+
+    @staticmethod
+    def viewer_data(request, cached, liked):
+        data = dict(cached["data"])
+        if "is_host" in data:
+            data["is_host"] = cached["host_id"] == request.user.pk
+        if "is_liked" in data:
+            data["is_liked"] = liked
+        return data
+
+    def get_validators(self, request, pk):
+        liked = pk in load_liked(request)["experiences"]
+        version = get_version("experience", pk)
+        return self.make_etag(request, pk, version, liked), None
+
+    @conditional(get_validators)
     def get(self, request, pk):
-        experience = self.get_object(pk)
-        serializer = ExperienceDetailSerializer(
-            experience,
-            context={"request": request},
+        fields = get_sparse_fields(request, ExperienceDetailSerializer)
+        # The viewer-independent part is cached until the experience or
+        # anything nested in it changes (see experiences/signals.py).
+        cached = get_cached(
+            "experience",
+            pk,
+            lambda: self.build_detail(pk, fields),
+            variant=sparse_key(fields),
         )
-        return Response(serializer.data)
+        liked = pk in load_liked(request)["experiences"]
+        return Response(self.viewer_data(request, cached, liked))
 
     def put(self, request, pk):
         experience = self.get_object(pk)
@@ -178,17 +255,11 @@ class ExperienceDetail(APIView):
             except Category.DoesNotExist:
                 raise NotFound("Category not found")
 
-            perk_pks = request.data.get("perks")
-            perks = []
-            if not perk_pks:
-                perk_pks = []
-            try:
-                for perk_pk in perk_pks:
-                    perk = Perk.objects.get(pk=perk_pk)
-                    perks.append(perk)
-            except Perk.DoesNotExist:
-                raise ParseError("Perk not found")
-
+            perks = resolve_related(
+                Perk.objects.all(),
+                request.data.get("perks"),
+                "Perk",
+            )
             updated_experience = serializer.save(
                 category=category,
                 perks=perks,
@@ -224,20 +295,21 @@ class ExperienceReviews(APIView):
             raise NotFound
 
     def get(self, request, pk):
-        try:
-            page = request.query_params.get("page", 1)
-            page = int(page)
-        except ValueError:
-            page = 1
-        page_size = settings.PAGE_SIZE
-        start = (page - 1) * page_size
-        end = start + page_size
         experience = self.get_object(pk)
+        reviews, next_cursor = paginate(
+            request, experience.reviews.select_related("user")
+        )
         serializer = ReviewSerializer(
-            experience.reviews.all()[start:end],
+            reviews,
             many=True,
         )
-        return Response(serializer.data)
+        return Response(
+            {
+                "results": serializer.data,
+                "next": next_cursor,
+                "count": experience.review_count,
+            }
+        )
 
     def post(self, request, pk):
         serializer = ReviewSerializer(data=request.data)
@@ -263,20 +335,19 @@ class ExperiencePerks(APIView):
             raise NotFound
 
     def get(self, request, pk):
-        try:
-            page = request.query_params.get("page", 1)
-            page = int(page)
-        except ValueError:
-            page = 1
-        page_size = settings.PAGE_SIZE
-        start = (page - 1) * page_size
-        end = start + page_size
         experience = self.get_object(pk)
+        perks, next_cursor = paginate(request, experience.perks.all())
         serializer = PerkSerializer(
-            experience.perks.all()[start:end],
+            perks,
             many=True,
         )
-        return Response(serializer.data)
+        return Response(
+            {
+                "results": serializer.data,
+                "next": next_cursor,
+                "count": experience.perks.count(),
+            }
+        )
 
 
 class ExperiencePhotos(APIView):
@@ -296,9 +367,11 @@ class ExperiencePhotos(APIView):
         serializer = PhotoSerializer(data=request.data)
 
         if serializer.is_valid():
-            photo = serializer.save(
-                experience=experience,
-            )
+            with transaction.atomic():
+                photo = serializer.save(
+                    experience=experience,
+                    position=next_position("experience", experience),
+                )
             return Response(PhotoSerializer(photo).data)
         else:
             return Response(
@@ -307,6 +380,36 @@ class ExperiencePhotos(APIView):
             )
 
 
+class ExperiencePhotoBatch(APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_object(self, pk):
+        try:
+            return Experience.objects.get(pk=pk)
+        except Experience.DoesNotExist:
+            raise NotFound
+
+    def post(self, request, pk):
+        experience = self.get_object(pk)
+        if request.user.pk != experience.host_id:
+            raise PermissionDenied
+        serializer = PhotoBatchSerializer(data=request.data)
+        if serializer.is_valid():
+            photos = attach_photos(
+                "experience",
+                experience,
+                serializer.validated_data["photos"],
+                cover=serializer.validated_data.get("cover"),
+            )
+            return Response(PhotoSerializer(photos, many=True).data)
+        else:
+            return Response(
+                serializer.errors,
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+
 class ExperienceVideo(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -436,3 +539,36 @@ class ExperienceBooking(APIView):
                 serializer.errors,
                 status=HTTP_400_BAD_REQUEST,
             )
+
+
+class AsyncExperiences(AsyncReadView):
+
+    api_view = Experiences
+
+    async def get_validators(self, request):
+        return await apage_validators(
+            request,
+            Experience.objects.all(),
+            settings.LIST_PAGE_SIZE,
+            request.user.pk,
+        )
+
+    @aconditional(get_validators)
+    async def get(self, request):
+        experiences, next_cursor = await apaginate(
+            request,
+            Experience.objects.for_list(),
+            page_size=settings.LIST_PAGE_SIZE,
+        )
+        pks = [experience["pk"] for experience in experiences]
+        return Response(
+            {
+                "results": experience_list_data(
+                    experiences,
+                    request,
+                    photos=await aphoto_data_by("experience_id", pks),
+                    videos=await avideo_files_by(pks),
+                ),
+                "next": next_cursor,
+            }
+        )
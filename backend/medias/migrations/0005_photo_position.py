@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("medias", "0004_alter_video_experience"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="photo",
+            options={"ordering": ("position", "pk")},
+        ),
+        migrations.AddField(
+            model_name="photo",
+            name="position",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -21,6 +21,13 @@ class Photo(CommonModel):
         on_delete=models.CASCADE,
         related_name="photos",
     )
+    position = models.PositiveIntegerField(
+        default=0,
+    )
+
+    class Meta:
+        # The first photo is the cover.
+        ordering = ("position", "pk")
 
     def __str__(self) -> str:
         return "Photo File"
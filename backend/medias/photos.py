@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models import F, Max
+from .models import Photo
+from .signals import photos_attached
+
+
+def next_position(field, parent):
+    """Position that puts a new photo after the existing ones.
+
+    Locks the parent row until the end of the transaction, so concurrent
+    uploads to the same room or experience take positions one at a time.
+    """
+
+    type(parent).objects.select_for_update().values("pk").get(pk=parent.pk)
+    last = Photo.objects.filter(**{f"{field}_id": parent.pk}).aggregate(
+        last=Max("position")
+    )["last"]
+    return 0 if last is None else last + 1
+
+
+def attach_photos(field, parent, photos, cover=None):
+    """Add photos to a room or an experience in one transaction.
+
+    field is "room" or "experience" and photos is a list of validated
+    PhotoSerializer data, kept in the given order after the existing photos.
+    cover is the index of the one to move in front of every other photo.
+    Returns the created photos.
+    """
+
+    with transaction.atomic():
+        start = next_position(field, parent)
+        if cover is not None:
+            Photo.objects.filter(**{f"{field}_id": parent.pk}).update(
+                position=F("position") + 1
+            )
+            start += 1
+        positions = list(range(start, start + len(photos)))
+        if cover is not None:
+            positions.pop(cover)
+            positions.insert(cover, 0)
+        created = Photo.objects.bulk_create(
+            [
+                Photo(**{field: parent}, position=position, **data)
+                for position, data in zip(positions, photos)
+            ]
+        )
+    photos_attached.send(Photo, field=field, pk=parent.pk)
+    return sorted(created, key=lambda photo: photo.position)
@@ -1,3 +1,5 @@
+from django.conf import settings
+from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 from .models import Photo, Video
 
@@ -13,8 +15,72 @@ class PhotoSerializer(ModelSerializer):
         )
 
 
+class PhotoBatchSerializer(serializers.Serializer):
+
+    photos = PhotoSerializer(
+        many=True,
+        allow_empty=False,
+        max_length=settings.PHOTO_BATCH_MAX_SIZE,
+    )
+    cover = serializers.IntegerField(
+        required=False,
+        min_value=0,
+    )
+
+    def validate(self, data):
+        if data.get("cover", 0) >= len(data["photos"]):
+            raise serializers.ValidationError({"cover": "No photo at this index"})
+        return data
+
+
 class VideoSerializer(ModelSerializer):
 
     class Meta:
         model = Video
         fields = ("file",)
+
+
+def photo_data_by(field, pks):
+    """PhotoSerializer output for the photos of many rooms or experiences.
+
+    field is "room_id" or "experience_id"; the result maps each of the pks
+    to its list of photos, loaded with one query.
+    """
+
+    return group_photos(field, pks, photo_rows(field, pks))
+
+
+async def aphoto_data_by(field, pks):
+    return group_photos(field, pks, [photo async for photo in photo_rows(field, pks)])
+
+
+def photo_rows(field, pks):
+    return (
+        Photo.objects.filter(**{f"{field}__in": pks})
+        .order_by("position", "pk")
+        .values("pk", "file", "description", field)
+    )
+
+
+def group_photos(field, pks, rows):
+    photos = {pk: [] for pk in pks}
+    for photo in rows:
+        photos[photo.pop(field)].append(photo)
+    return photos
+
+
+def video_files_by(pks):
+    """Video file of each experience that has one"""
+
+    return dict(video_rows(pks))
+
+
+async def avideo_files_by(pks):
+    return {pk: file async for pk, file in video_rows(pks)}
+
+
+def video_rows(pks):
+    return Video.objects.filter(experience_id__in=pks).values_list(
+        "experience_id",
+        "file",
+    )
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent once by attach_photos() instead of a post_save per photo, since
+# bulk_create() skips those. Receives field ("room" or "experience") and pk.
+photos_attached = Signal()
@@ -1,3 +1,100 @@
-from django.test import TestCase
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from common.http import http
+from common.testing import FakeUpstream
+from .upload_urls import UploadURLPool, create_upload_url, upload_urls
 
-# Create your tests here.
+
+class FakeCloudflare(FakeUpstream):
+    """Cloudflare's direct_upload API, answering with numbered URLs"""
+
+    PATH = "/accounts/x/images/v2/direct_upload"
+
+    def __init__(self):
+        numbers = itertools.count(1)
+        super().__init__(
+            {
+                ("POST", self.PATH): lambda request: (
+                    200,
+                    {
+                        "result": {
+                            "uploadURL": f"https://upload.example/{next(numbers)}"
+                        }
+                    },
+                )
+            }
+        )
+
+    def __enter__(self):
+        super().__enter__()
+        self.settings = override_settings(
+            CLOUDFLARE_API_URL=self.url,
+            CF_ID="x",
+            CF_TOKEN="t",
+        )
+        self.settings.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.settings.disable()
+        super().__exit__(*exc_info)
+
+
+class TestUploadURLPool(APITestCase):
+
+    def setUp(self):
+        http.reset()
+        upload_urls.clear()
+
+    def make_pool(self, create_url=create_upload_url):
+        return UploadURLPool(create_url, size=3, refill_at=1, min_remaining=60)
+
+    def test_refill_in_background(self):
+        with FakeCloudflare() as fake:
+            pool = self.make_pool()
+            # Empty: created on the spot, and a refill starts.
+            self.assertEqual(pool.get(), "https://upload.example/1")
+            pool.refill_future.result()
+            self.assertEqual(len(fake.calls(fake.PATH)), 4)
+            self.assertEqual(pool.get(), "https://upload.example/2")
+            self.assertEqual(pool.get(), "https://upload.example/3")
+            pool.refill_future.result()
+            self.assertEqual(pool.get(), "https://upload.example/4")
+            pool.refill_future.result()
+        call = fake.calls(fake.PATH)[0]
+        self.assertEqual(call["headers"]["Authorization"], "Bearer t")
+        self.assertIn('name="expiry"', call["body"])
+
+    def test_expired_urls_are_skipped(self):
+        urls = itertools.chain(
+            [(0, "expired"), (0, "expired too")],
+            itertools.repeat((10**12, "fresh")),
+        )
+        pool = self.make_pool(lambda: next(urls))
+        pool.refill()
+        self.assertEqual(pool.get(), "fresh")
+        pool.refill_future.result()
+        self.assertEqual(len(pool.urls), 3)
+
+    def test_concurrent_refills_stop_at_size(self):
+        created = itertools.count()
+
+        def create_url():
+            time.sleep(0.01)
+            return 10**12, f"url {next(created)}"
+
+        pool = self.make_pool(create_url)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for future in [executor.submit(pool.refill) for _ in range(4)]:
+                future.result()
+        self.assertEqual(next(created), 3)
+        self.assertEqual(len(pool.urls), 3)
+
+    def test_view(self):
+        with FakeCloudflare():
+            response = self.client.post("/api/v1/medias/photos/get-url")
+            upload_urls.refill_future.result()
+        self.assertEqual(response.json(), {"uploadURL": "https://upload.example/1"})
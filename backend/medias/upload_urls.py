@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from django.conf import settings
+from common.http import executor, http
+
+logger = logging.getLogger(__name__)
+
+
+def create_upload_url():
+    """A new one-time Cloudflare Images upload URL and when it expires"""
+
+    expires_at = time.time() + settings.UPLOAD_URL_TTL
+    response = http.post(
+        f"{settings.CLOUDFLARE_API_URL}/accounts/{settings.CF_ID}/images/v2/direct_upload",
+        headers={
+            "Authorization": f"Bearer {settings.CF_TOKEN}",
+        },
+        files={
+            "expiry": (
+                None,
+                datetime.fromtimestamp(expires_at, timezone.utc).isoformat(),
+            ),
+        },
+    )
+    response.raise_for_status()
+    return expires_at, response.json()["result"]["uploadURL"]
+
+
+class UploadURLPool:
+    """One-time upload URLs created ahead of time and handed out in O(1).
+
+    URLs are kept oldest first with their expiry, and the ones with less
+    than `min_remaining` seconds left are dropped. Going down to `refill_at`
+    URLs starts a background refill up to `size`; when the pool is empty a
+    URL is created on the spot.
+    """
+
+    def __init__(self, create_url, size, refill_at, min_remaining):
+        self.create_url = create_url
+        self.size = size
+        self.refill_at = refill_at
+        self.min_remaining = min_remaining
+        self.urls = deque()
+        self.lock = threading.Lock()
+        self.creating = 0
+        self.refill_future = None
+
+    def get(self):
+        now = time.time()
+        with self.lock:
+            while self.urls and self.urls[0][0] - now < self.min_remaining:
+                self.urls.popleft()
+            url = self.urls.popleft()[1] if self.urls else None
+            low = len(self.urls) <= self.refill_at
+        if url is None:
+            _, url = self.create_url()
+        if low:
+            self.start_refill()
+        return url
+
+    def start_refill(self):
+        with self.lock:
+            if self.refill_future is None or self.refill_future.done():
+                self.refill_future = executor.submit(self.refill)
+
+    def refill(self):
+        while self.reserve():
+            try:
+                entry = self.create_url()
+            except Exception:
+                with self.lock:
+                    self.creating -= 1
+                logger.exception("Could not refill the upload URL pool")
+                return
+            with self.lock:
+                self.creating -= 1
+                self.urls.append(entry)
+
+    def reserve(self):
+        """Count one more URL as being created, unless that fills the pool.
+
+        URLs still being created count, so concurrent refills never make
+        more than `size` between them.
+        """
+
+        with self.lock:
+            if len(self.urls) + self.creating >= self.size:
+                return False
+            self.creating += 1
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.urls.clear()
+
+
+upload_urls = UploadURLPool(
+    create_upload_url,
+    size=settings.UPLOAD_URL_POOL_SIZE,
+    refill_at=settings.UPLOAD_URL_POOL_REFILL_AT,
+    min_remaining=settings.UPLOAD_URL_MIN_REMAINING,
+)
@@ -1,11 +1,10 @@
-from django.conf import settings
-import requests
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK
 from rest_framework.exceptions import NotFound, PermissionDenied
 from .models import Photo, Video
+from .upload_urls import upload_urls
 
 
 class PhotoDetail(APIView):
@@ -49,13 +48,4 @@ class VideoDetail(APIView):
 class GetUploadURL(APIView):
 
     def post(self, request):
-        url = f"https://api.cloudflare.com/client/v4/accounts/{settings.CF_ID}/images/v2/direct_upload"
-        one_time_url = requests.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {settings.CF_TOKEN}",
-            },
-        )
-        one_time_url = one_time_url.json()
-        result = one_time_url.get("result")
-        return Response({"uploadURL": result.get("uploadURL")})
+        return Response({"uploadURL": upload_urls.get()})
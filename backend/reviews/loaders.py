@@ -0,0 +1,24 @@
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from .models import Review
+
+
+def load_room_reviews(room_pks, page_size):
+    """The first page of reviews of each room plus one more, in one query"""
+
+    reviews = {pk: [] for pk in room_pks}
+    rows = (
+        Review.objects.filter(room__in=room_pks)
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("room_id"),
+                order_by=[F("created_at").desc(), F("pk").desc()],
+            )
+        )
+        .filter(position__lte=page_size + 1)
+        .order_by("room_id", "position")
+    )
+    for review in rows:
+        reviews[review.room_id].append(review)
+    return reviews
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from rooms.models import Room
+from experiences.models import Experience
+from reviews.models import Review
+
+
+def rebuild(model, field_name):
+    reviews = (
+        Review.objects.filter(**{field_name: OuterRef("pk")})
+        .order_by()
+        .values(field_name)
+    )
+    return model.objects.update(
+        review_count=Coalesce(
+            Subquery(reviews.annotate(count=Count("pk")).values("count")),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+        rating_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum("rating")).values("total")),
+            Value(0),
+            output_field=IntegerField(),
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = "Recalculate the stored review count and rating sum of every room and experience"
+
+    def handle(self, *args, **options):
+        rooms = rebuild(Room, "room")
+        experiences = rebuild(Experience, "experience")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt ratings for {rooms} rooms and {experiences} experiences"
+            )
+        )
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:49
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    for model, field_name in (
+        (apps.get_model("rooms", "Room"), "room"),
+        (apps.get_model("experiences", "Experience"), "experience"),
+    ):
+        reviews = (
+            Review.objects.filter(**{field_name: OuterRef("pk")})
+            .order_by()
+            .values(field_name)
+        )
+        model.objects.update(
+            review_count=Coalesce(
+                Subquery(reviews.annotate(count=Count("pk")).values("count")),
+                Value(0),
+                output_field=IntegerField(),
+            ),
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum("rating")).values("total")),
+                Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0003_alter_review_experience_alter_review_room_and_more"),
+        ("rooms", "0006_review_aggregate"),
+        ("experiences", "0004_review_aggregate"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("experiences", "0005_created_at_index"),
+        ("reviews", "0004_backfill_review_aggregates"),
+        ("rooms", "0007_created_at_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["room", "created_at", "id"],
+                name="reviews_rev_room_id_4879a8_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["experience", "created_at", "id"],
+                name="reviews_rev_experie_daa90e_idx",
+            ),
+        ),
+    ]
@@ -29,3 +29,9 @@ class Review(CommonModel):
 
     def __str__(self) -> str:
         return f"{self.user} / {self.rating}⭐"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["room", "created_at", "id"]),
+            models.Index(fields=["experience", "created_at", "id"]),
+        ]
@@ -0,0 +1,58 @@
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from common.cache import bump_version
+from rooms.models import Room
+from experiences.models import Experience
+from .models import Review
+
+
+def apply_review(review, sign):
+    """Add (sign=1) or remove (sign=-1) a review from its target's aggregate."""
+
+    if review["room_id"]:
+        model, name, pk = Room, "room", review["room_id"]
+    elif review["experience_id"]:
+        model, name, pk = Experience, "experience", review["experience_id"]
+    else:
+        return
+    model.objects.filter(pk=pk).update(
+        review_count=F("review_count") + sign,
+        rating_sum=F("rating_sum") + sign * review["rating"],
+        updated_at=timezone.now(),
+    )
+    # After the update, so the detail cache never keeps the old rating.
+    bump_version(name, pk)
+
+
+def review_values(review):
+    return {
+        "room_id": review.room_id,
+        "experience_id": review.experience_id,
+        "rating": review.rating,
+    }
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_review(sender, instance, **kwargs):
+    instance._previous_values = None
+    if instance.pk:
+        instance._previous_values = (
+            Review.objects.filter(pk=instance.pk)
+            .values("room_id", "experience_id", "rating")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_aggregate(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_values", None)
+    if previous:
+        apply_review(previous, -1)
+    apply_review(review_values(instance), 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_aggregate(sender, instance, **kwargs):
+    apply_review(review_values(instance), -1)
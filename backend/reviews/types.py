@@ -1,6 +1,7 @@
 import strawberry
 from strawberry import auto
 from . import models
+from common.types import Connection
 
 
 @strawberry.django.type(models.Review)
@@ -8,3 +9,8 @@ class ReviewType:
     id: auto
     payload: auto
     rating: auto
+
+
+@strawberry.type
+class ReviewConnection(Connection[ReviewType]):
+    total_count: int
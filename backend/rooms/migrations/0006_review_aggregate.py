@@ -0,0 +1,23 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("rooms", "0005_alter_room_amenities_alter_room_category_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="room",
+            name="rating_sum",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="room",
+            name="review_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
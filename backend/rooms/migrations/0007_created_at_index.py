@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-18 14:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0002_alter_category_options"),
+        ("rooms", "0006_review_aggregate"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="room",
+            index=models.Index(
+                fields=["created_at", "id"], name="rooms_room_created_2438c1_idx"
+            ),
+        ),
+    ]
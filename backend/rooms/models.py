@@ -1,5 +1,35 @@
 from django.db import models
-from common.models import CommonModel
+from common.models import CommonModel, average_rating
+from bookings.models import Booking
+
+
+class RoomQuerySet(models.QuerySet):
+
+    def for_list(self):
+        """Rows with just the columns room_list_data() needs"""
+        return self.values(
+            "pk",
+            "name",
+            "country",
+            "city",
+            "price",
+            "review_count",
+            "rating_sum",
+            "owner_id",
+            "created_at",
+        )
+
+    def available(self, check_in, check_out):
+        """Rooms with no room booking overlapping [check_in, check_out]"""
+        return self.filter(
+            ~models.Exists(
+                Booking.objects.overlapping(
+                    models.OuterRef("pk"),
+                    check_in,
+                    check_out,
+                )
+            )
+        )
 
 
 class Room(CommonModel):
@@ -24,6 +54,10 @@ class Room(CommonModel):
     )
     price = models.PositiveIntegerField()
     rooms = models.PositiveIntegerField()
+    max_guests = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+    )
     toilets = models.PositiveIntegerField()
     description = models.TextField()
     address = models.CharField(
@@ -52,6 +86,16 @@ class Room(CommonModel):
         on_delete=models.SET_NULL,
         related_name="rooms",
     )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+
+    objects = RoomQuerySet.as_manager()
 
     def __str__(self) -> str:
         return self.name
@@ -60,14 +104,13 @@ class Room(CommonModel):
         return room.amenities.count()
 
     def rating(room):
-        count = room.reviews.count()
-        if count == 0:
-            return 0
-        else:
-            total_ratings = 0
-            for review in room.reviews.all().values("rating"):
-                total_ratings += review["rating"]
-            return round(total_ratings / count, 2)
+        return average_rating(room.rating_sum, room.review_count)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["country", "city"]),
+        ]
 
 
 class Amenity(CommonModel):
@@ -5,6 +5,7 @@ from strawberry.types import Info
 from enum import Enum
 from .models import Room, Amenity
 from categories.models import Category
+from common.serializers import resolve_related
 
 
 @strawberry.enum
@@ -35,29 +36,21 @@ def add_room(
             raise Exception("Category kind should be 'rooms'")
     except Category.DoesNotExist:
         raise Exception("Category not found")
-    try:
-        with transaction.atomic():
-            room = Room.objects.create(
-                name=name,
-                country=country,
-                city=city,
-                price=price,
-                rooms=rooms,
-                toilets=toilets,
-                description=description,
-                address=address,
-                pet_friendly=pet_friendly,
-                kind=kind.value,
-                owner=info.context.request.user,
-                category=category,
-            )
-
-            for amenity_pk in amenities:
-                amenity = Amenity.objects.get(pk=amenity_pk)
-                room.amenities.add(amenity)
-
-            room.save()
-
-            return room
-    except Exception:
-        raise Exception("Amenity not found")
+    amenities = resolve_related(Amenity.objects.all(), amenities, "Amenity")
+    with transaction.atomic():
+        room = Room.objects.create(
+            name=name,
+            country=country,
+            city=city,
+            price=price,
+            rooms=rooms,
+            toilets=toilets,
+            description=description,
+            address=address,
+            pet_friendly=pet_friendly,
+            kind=kind.value,
+            owner=info.context.request.user,
+            category=category,
+        )
+        room.amenities.set(amenities)
+        return room
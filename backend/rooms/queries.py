@@ -1,9 +1,38 @@
+import typing
+from django.conf import settings
 from strawberry.types import Info
 from . import models
+from .mutations import RoomKindChoices
+from common.pagination import bound_page_size, paginate_queryset
+from common.types import Connection, make_connection
 
 
-def get_all_rooms(info: Info):
-    return models.Room.objects.all()
+def get_all_rooms(
+    info: Info,
+    first: int = settings.LIST_PAGE_SIZE,
+    after: typing.Optional[str] = None,
+    city: typing.Optional[str] = None,
+    kind: typing.Optional[RoomKindChoices] = None,
+    min_price: typing.Optional[int] = None,
+    max_price: typing.Optional[int] = None,
+):
+    rooms = models.Room.objects.all()
+    if city:
+        rooms = rooms.filter(city=city)
+    if kind:
+        rooms = rooms.filter(kind=kind.value)
+    if min_price is not None:
+        rooms = rooms.filter(price__gte=min_price)
+    if max_price is not None:
+        rooms = rooms.filter(price__lte=max_price)
+    rooms, next_cursor = paginate_queryset(
+        rooms,
+        cursor=after,
+        page_size=bound_page_size(first),
+    )
+    # Owners and reviews of the whole page are then loaded in batches.
+    info.context.loaders.queue_rooms(rooms)
+    return make_connection(Connection, rooms, next_cursor)
 
 
 def get_room(pk: int):
@@ -2,11 +2,12 @@ import strawberry
 import typing
 from . import types, queries, mutations
 from common.permissions import OnlyLoggedIn
+from common.types import Connection
 
 
 @strawberry.type
 class Query:
-    all_rooms: typing.List[types.RoomType] = strawberry.field(
+    all_rooms: Connection[types.RoomType] = strawberry.field(
         resolver=queries.get_all_rooms,
     )
     room: typing.Optional[types.RoomType] = strawberry.field(
@@ -2,8 +2,10 @@ from rest_framework import serializers
 from .models import Amenity, Room
 from users.serializers import TinyUserSerializer
 from categories.serializers import CategorySerializer
-from medias.serializers import PhotoSerializer
-from wishlists.models import Wishlist
+from medias.serializers import PhotoSerializer, photo_data_by
+from common.models import average_rating
+from common.serializers import SparseFieldsSerializerMixin
+from wishlists.liked import is_room_liked
 
 
 class AmenitySerializer(serializers.ModelSerializer):
@@ -16,7 +18,14 @@ class AmenitySerializer(serializers.ModelSerializer):
         )
 
 
-class RoomDetailSerializer(serializers.ModelSerializer):
+class RoomDetailSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+
+    expandable = {
+        "owner": "select",
+        "category": "select",
+        "amenities": "prefetch",
+        "photos": "prefetch",
+    }
 
     owner = TinyUserSerializer(
         read_only=True,
@@ -38,7 +47,7 @@ class RoomDetailSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Room
-        fields = "__all__"
+        exclude = ("rating_sum",)
 
     def get_rating(self, room):
         return room.rating()
@@ -52,11 +61,7 @@ class RoomDetailSerializer(serializers.ModelSerializer):
     def get_is_liked(self, room):
         request = self.context.get("request")
         if request:
-            if request.user.is_authenticated:
-                return Wishlist.objects.filter(
-                    user=request.user,
-                    rooms__pk=room.pk,
-                ).exists()
+            return is_room_liked(request, room)
         return False
 
 
@@ -87,7 +92,31 @@ class RoomListSerializer(serializers.ModelSerializer):
 
     def get_is_owner(self, room):
         request = self.context["request"]
-        return room.owner == request.user
+        return room.owner_id == request.user.pk
+
+
+def room_list_data(rooms, request, photos=None):
+    """RoomListSerializer(rooms, many=True).data for Room.objects.for_list() rows.
+
+    Hot list endpoints use this instead of the serializer so no field objects
+    are built per room. Async views pass the photos they loaded themselves.
+    """
+
+    if photos is None:
+        photos = photo_data_by("room_id", [room["pk"] for room in rooms])
+    return [
+        {
+            "pk": room["pk"],
+            "name": room["name"],
+            "country": room["country"],
+            "city": room["city"],
+            "price": room["price"],
+            "rating": average_rating(room["rating_sum"], room["review_count"]),
+            "is_owner": room["owner_id"] == request.user.pk,
+            "photos": photos[room["pk"]],
+        }
+        for room in rooms
+    ]
 
 
 class SmallRoomSerializer(serializers.ModelSerializer):
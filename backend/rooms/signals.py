@@ -0,0 +1,58 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from common.cache import bump_version, bump_versions
+from categories.models import Category
+from medias.models import Photo
+from medias.signals import photos_attached
+from .models import Room, Amenity
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+def room_changed(sender, instance, **kwargs):
+    bump_version("room", instance.pk)
+
+
+@receiver(m2m_changed, sender=Room.amenities.through)
+def room_amenities_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        bump_versions("room", pk_set or [])
+    else:
+        bump_version("room", instance.pk)
+
+
+@receiver(post_save, sender=Amenity)
+@receiver(pre_delete, sender=Amenity)
+def amenity_changed(sender, instance, **kwargs):
+    bump_versions("room", instance.rooms.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_versions("room", instance.rooms.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def room_child_changed(sender, instance, **kwargs):
+    if instance.room_id:
+        bump_version("room", instance.room_id)
+
+
+@receiver(post_save, sender=Photo)
+@receiver(post_delete, sender=Photo)
+def room_photo_changed(sender, instance, **kwargs):
+    # Photos are part of the room list payload, so they count as a change to
+    # the room for conditional GETs.
+    if instance.room_id:
+        Room.objects.filter(pk=instance.room_id).update(updated_at=timezone.now())
+
+
+@receiver(photos_attached)
+def room_photos_attached(sender, field, pk, **kwargs):
+    if field == "room":
+        bump_version("room", pk)
+        Room.objects.filter(pk=pk).update(updated_at=timezone.now())
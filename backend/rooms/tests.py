@@ -1,6 +1,37 @@
-from rest_framework.test import APITestCase
-from . import models
+import json
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from unittest import skipUnless
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase
+from . import models, views
+from .management.commands.import_rooms import copy_value
+from .serializers import RoomListSerializer, room_list_data
+from common.cache import get_version
 from users.models import User
+from categories.models import Category
+from reviews.models import Review
+from medias.models import Photo
+from medias.photos import attach_photos
+from bookings.models import Booking
+from wishlists.models import Wishlist
+from bookings.serializers import (
+    CreateRoomBookingSerializer,
+    PublicRoomBookingSerializer,
+    is_overlap_violation,
+    public_room_booking_data,
+)
 
 
 class TestAmenities(APITestCase):
@@ -207,3 +238,1210 @@ class TestRooms(APITestCase):
         self.client.force_login(self.user)
         response = self.client.post("/api/v1/rooms/")
         print(response.json())
+
+
+class TestRoomRating(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="reviewer")
+        self.room = models.Room.objects.create(
+            name="Rating Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+
+    def test_rating_follows_reviews(self):
+        self.client.force_login(self.user)
+        for rating in (5, 4):
+            response = self.client.post(
+                f"/api/v1/rooms/{self.room.pk}/reviews",
+                data={"payload": "review", "rating": rating},
+            )
+            self.assertEqual(response.status_code, 200)
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.review_count, 2)
+        self.assertEqual(self.room.rating(), 4.5)
+
+        review = Review.objects.get(rating=4)
+        review.rating = 1
+        review.save()
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.rating(), 3)
+
+        review.delete()
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.review_count, 1)
+        self.assertEqual(self.room.rating(), 5)
+
+    def test_rebuild_ratings(self):
+        Review.objects.create(user=self.user, room=self.room, payload="a", rating=3)
+        models.Room.objects.update(review_count=0, rating_sum=0)
+        call_command("rebuild_ratings", stdout=StringIO())
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.review_count, 1)
+        self.assertEqual(self.room.rating_sum, 3)
+
+
+class TestRoomListQueries(APITestCase):
+
+    URL = "/api/v1/rooms/"
+
+    def setUp(self):
+        self.user = User.objects.create(username="host")
+
+    def create_rooms(self, count):
+        for i in range(count):
+            room = models.Room.objects.create(
+                name=f"Room {i}",
+                price=100,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=self.user,
+            )
+            Photo.objects.create(file="https://example.com/a.png", room=room)
+            Review.objects.create(user=self.user, room=room, payload="a", rating=4)
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.URL)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rooms(self):
+        self.client.force_login(self.user)
+        self.create_rooms(1)
+        few = self.count_queries()
+        self.create_rooms(10)
+        many = self.count_queries()
+        self.assertEqual(few, many)
+
+    def test_cursor_pagination(self):
+        self.create_rooms(5)
+        seen = []
+        url = f"{self.URL}?page_size=2"
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data["results"]), 2)
+            seen += [room["pk"] for room in data["results"]]
+            url = data["next"] and f"{self.URL}?page_size=2&cursor={data['next']}"
+        self.assertEqual(
+            seen,
+            list(
+                models.Room.objects.order_by("-created_at", "-pk").values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+
+        response = self.client.get(f"{self.URL}?cursor=nope")
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomReviews(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="reviewer")
+        self.room = models.Room.objects.create(
+            name="Reviewed Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        for rating in range(1, 6):
+            Review.objects.create(
+                user=self.user,
+                room=self.room,
+                payload=f"review {rating}",
+                rating=rating,
+            )
+
+    def test_reviews_pages(self):
+        url = f"/api/v1/rooms/{self.room.pk}/reviews"
+        payloads = []
+        while url:
+            data = self.client.get(url).json()
+            self.assertEqual(data["count"], 5)
+            payloads += [review["payload"] for review in data["results"]]
+            url = (
+                data["next"]
+                and f"/api/v1/rooms/{self.room.pk}/reviews?cursor={data['next']}"
+            )
+        self.assertEqual(
+            payloads,
+            [f"review {rating}" for rating in range(5, 0, -1)],
+        )
+
+
+class TestRoomBookingCheck(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="guest")
+        self.room = models.Room.objects.create(
+            name="Booked Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.user,
+            room=self.room,
+            check_in="2030-01-10",
+            check_out="2030-01-15",
+            guests=1,
+        )
+
+    def check(self, check_in, check_out):
+        response = self.client.get(
+            f"/api/v1/rooms/{self.room.pk}/bookings/check",
+            {"check_in": check_in, "check_out": check_out},
+        )
+        return response.json()["ok"]
+
+    def test_overlap(self):
+        self.assertFalse(self.check("2030-01-14", "2030-01-20"))
+        self.assertFalse(self.check("2030-01-05", "2030-01-10"))
+        self.assertTrue(self.check("2030-01-16", "2030-01-20"))
+
+    def test_ignores_other_kinds(self):
+        Booking.objects.update(kind=Booking.BookingKindChoices.EXPERIENCE)
+        self.assertTrue(self.check("2030-01-14", "2030-01-20"))
+
+    def test_overlapping_booking_conflicts(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            f"/api/v1/rooms/{self.room.pk}/bookings",
+            {"check_in": "2030-01-12", "check_out": "2030-01-14", "guests": 1},
+        )
+        self.assertEqual(response.status_code, 409)
+        response = self.client.post(
+            f"/api/v1/rooms/{self.room.pk}/bookings",
+            {"check_in": "2030-01-16", "check_out": "2030-01-18", "guests": 1},
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_availability(self):
+        for check_in, check_out in (
+            ("2030-01-16", "2030-01-20"),
+            ("2030-02-01", "2030-02-03"),
+        ):
+            Booking.objects.create(
+                kind=Booking.BookingKindChoices.ROOM,
+                user=self.user,
+                room=self.room,
+                check_in=check_in,
+                check_out=check_out,
+                guests=1,
+            )
+        url = f"/api/v1/rooms/{self.room.pk}/availability"
+        response = self.client.get(url, {"from": "2030-01-12", "to": "2030-02-02"})
+        self.assertEqual(
+            response.json()["blocked"],
+            [["2030-01-12", "2030-01-20"], ["2030-02-01", "2030-02-02"]],
+        )
+
+        response = self.client.get(url, {"from": "2030-01-01", "to": "2032-01-01"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomSearch(APITestCase):
+
+    URL = "/api/v1/rooms/search"
+
+    def create_room(self, name, **kwargs):
+        fields = {
+            "price": 100,
+            "rooms": 1,
+            "toilets": 1,
+            "description": "desc",
+            "address": "address",
+            "kind": models.Room.RoomKindChoices.ENTIRE_PLACE,
+            "owner": self.user,
+        }
+        fields.update(kwargs)
+        return models.Room.objects.create(name=name, **fields)
+
+    def setUp(self):
+        self.user = User.objects.create(username="host")
+        self.wifi = models.Amenity.objects.create(name="Wifi")
+        self.free = self.create_room("Free", city="부산", max_guests=4)
+        self.free.amenities.add(self.wifi)
+        self.booked = self.create_room("Booked", city="부산", max_guests=4)
+        self.booked.amenities.add(self.wifi)
+        Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.user,
+            room=self.booked,
+            check_in="2030-03-01",
+            check_out="2030-03-05",
+            guests=1,
+        )
+        self.small = self.create_room("Small", city="부산", max_guests=1)
+        self.expensive = self.create_room("Expensive", city="부산", price=1000)
+        self.elsewhere = self.create_room("Elsewhere", city="서울")
+
+    def search(self, **params):
+        response = self.client.get(self.URL, params)
+        self.assertEqual(response.status_code, 200)
+        return {room["name"] for room in response.json()["results"]}
+
+    def test_search(self):
+        self.assertEqual(
+            self.search(check_in="2030-03-04", check_out="2030-03-06", city="부산"),
+            {"Free", "Small", "Expensive"},
+        )
+        self.assertEqual(
+            self.search(city="부산", guests=2, max_price=500),
+            {"Free", "Booked"},
+        )
+        self.assertEqual(
+            self.search(
+                check_in="2030-03-04",
+                check_out="2030-03-06",
+                amenities=str(self.wifi.pk),
+            ),
+            {"Free"},
+        )
+
+    def test_invalid_dates(self):
+        response = self.client.get(self.URL, {"check_in": "2030-03-04"})
+        self.assertEqual(response.status_code, 400)
+
+
+class TestRoomDetailCache(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="host")
+        self.room = models.Room.objects.create(
+            name="Cached Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        self.amenity = models.Amenity.objects.create(name="Wifi")
+        self.room.amenities.add(self.amenity)
+        self.url = f"/api/v1/rooms/{self.room.pk}"
+
+    def test_cached_until_changed(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            data = self.client.get(self.url).json()
+        self.assertFalse(data["is_owner"])
+        self.assertEqual(data["rating"], 0)
+
+        # Versions are bumped once the change commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(user=self.user, room=self.room, payload="a", rating=4)
+        self.assertEqual(self.client.get(self.url).json()["rating"], 4)
+
+        self.amenity.name = "Fast Wifi"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.amenity.save()
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["amenities"][0]["name"], "Fast Wifi")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.amenities.clear()
+        self.assertEqual(self.client.get(self.url).json()["amenities"], [])
+
+        self.client.force_login(self.user)
+        self.assertTrue(self.client.get(self.url).json()["is_owner"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_bumped_on_commit(self):
+        version = get_version("room", self.room.pk)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Review.objects.create(user=self.user, room=self.room, payload="a", rating=4)
+        self.assertEqual(get_version("room", self.room.pk), version)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_version("room", self.room.pk), version)
+
+
+class TestSparseFields(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="host")
+        self.room = models.Room.objects.create(
+            name="Sparse Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        self.room.amenities.add(models.Amenity.objects.create(name="Wifi"))
+        Photo.objects.create(file="https://example.com/a.png", room=self.room)
+        self.url = f"/api/v1/rooms/{self.room.pk}"
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), " ".join(query["sql"] for query in queries)
+
+    def test_fields(self):
+        data, sql = self.get(fields="name,price,is_owner")
+        self.assertEqual(data, {"name": "Sparse Room", "price": 100, "is_owner": False})
+        for table in ("users_user", "rooms_amenity", "medias_photo"):
+            self.assertNotIn(table, sql)
+
+        full = self.client.get(self.url).json()
+        self.assertIn("owner", full)
+        self.assertEqual(len(full["amenities"]), 1)
+
+    def test_expand(self):
+        data, sql = self.get(expand="photos")
+        self.assertEqual(len(data["photos"]), 1)
+        self.assertEqual(data["name"], "Sparse Room")
+        for name in ("owner", "category", "amenities"):
+            self.assertNotIn(name, data)
+        self.assertNotIn("rooms_amenity", sql)
+
+        data, _ = self.get(fields="name,owner", expand="")
+        self.assertEqual(data, {"name": "Sparse Room"})
+
+    def test_unknown(self):
+        self.assertEqual(self.client.get(self.url, {"fields": "nope"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"expand": "name"}).status_code, 400)
+
+
+class TestConditionalGet(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="host")
+        self.room = models.Room.objects.create(
+            name="Conditional Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+
+    def assertNotModifiedUntilChange(self, url, change):
+        response = self.client.get(url)
+        etag = response.headers["ETag"]
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_room_list(self):
+        self.assertNotModifiedUntilChange(
+            "/api/v1/rooms/",
+            lambda: Photo.objects.create(
+                file="https://example.com/a.png",
+                room=self.room,
+            ),
+        )
+
+    def test_room_list_rating(self):
+        self.assertNotModifiedUntilChange(
+            "/api/v1/rooms/",
+            lambda: Review.objects.create(
+                user=self.user,
+                room=self.room,
+                payload="a",
+                rating=5,
+            ),
+        )
+
+    def test_room_list_deleted_row(self):
+        newer = models.Room.objects.create(
+            name="Newer Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        response = self.client.get("/api/v1/rooms/")
+        self.assertNotIn("Last-Modified", response.headers)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.room.delete()
+        response = self.client.get(
+            "/api/v1/rooms/",
+            headers={"If-Modified-Since": http_date(newer.updated_at.timestamp())},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [room["pk"] for room in response.json()["results"]],
+            [newer.pk],
+        )
+
+    def test_room_detail(self):
+        amenity = models.Amenity.objects.create(name="Wifi")
+        self.assertNotModifiedUntilChange(
+            f"/api/v1/rooms/{self.room.pk}",
+            lambda: self.room.amenities.add(amenity),
+        )
+
+    def test_viewer_changes_etag(self):
+        url = f"/api/v1/rooms/{self.room.pk}"
+        etag = self.client.get(url).headers["ETag"]
+        self.client.force_login(self.user)
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_owner"])
+
+
+# Run the suite with DATABASE_URL=postgres://... to include these.
+@skipUnlessDBFeature("has_select_for_update")
+class TestConcurrentRoomBookings(TransactionTestCase):
+
+    THREADS = 8
+
+    def setUp(self):
+        self.user = User.objects.create(username="guest")
+        self.room = models.Room.objects.create(
+            name="Popular Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+
+    def book(self, barrier, check_in, check_out):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        barrier.wait()
+        try:
+            response = client.post(
+                f"/api/v1/rooms/{self.room.pk}/bookings",
+                {"check_in": check_in, "check_out": check_out, "guests": 1},
+            )
+            return response.status_code
+        finally:
+            connection.close()
+
+    def test_only_one_overlapping_booking_succeeds(self):
+        check_in = timezone.localdate() + timedelta(days=10)
+        barrier = threading.Barrier(self.THREADS)
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            futures = [
+                executor.submit(
+                    self.book,
+                    barrier,
+                    check_in + timedelta(days=i % 2),
+                    check_in + timedelta(days=3),
+                )
+                for i in range(self.THREADS)
+            ]
+            statuses = [future.result() for future in futures]
+        self.assertEqual(statuses.count(200), 1)
+        self.assertEqual(statuses.count(409), self.THREADS - 1)
+        self.assertEqual(Booking.objects.filter(room=self.room).count(), 1)
+
+
+class TestRoomBookingErrors(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="guest")
+        self.room = models.Room.objects.create(
+            name="Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        self.client.force_login(self.user)
+        check_in = timezone.localdate() + timedelta(days=10)
+        self.data = {
+            "check_in": check_in,
+            "check_out": check_in + timedelta(days=3),
+            "guests": 1,
+        }
+
+    def post_raising(self, error):
+        with mock.patch.object(CreateRoomBookingSerializer, "save", side_effect=error):
+            return self.client.post(f"/api/v1/rooms/{self.room.pk}/bookings", self.data)
+
+    def test_overlap_constraint_is_a_conflict(self):
+        error = IntegrityError("conflicting key value")
+        # What psycopg2 raises for an exclusion violation
+        error.__cause__ = Exception()
+        error.__cause__.diag = mock.Mock(
+            constraint_name="bookings_booking_room_no_overlap"
+        )
+        self.assertEqual(self.post_raising(error).status_code, 409)
+
+    def test_other_integrity_errors_are_raised(self):
+        with self.assertRaises(IntegrityError):
+            self.post_raising(IntegrityError("NOT NULL constraint failed"))
+
+    @skipUnlessDBFeature("has_select_for_update")
+    def test_overlap_constraint(self):
+        booking = {
+            "kind": Booking.BookingKindChoices.ROOM,
+            "user": self.user,
+            "room": self.room,
+            "guests": 1,
+        }
+        Booking.objects.create(check_in="2030-01-10", check_out="2030-01-15", **booking)
+        with self.assertRaises(IntegrityError) as raised, transaction.atomic():
+            Booking.objects.create(
+                check_in="2030-01-15", check_out="2030-01-20", **booking
+            )
+        self.assertTrue(is_overlap_violation(raised.exception))
+
+
+class TestListData(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="host")
+        self.rooms = []
+        for i in range(3):
+            room = models.Room.objects.create(
+                name=f"Room {i}",
+                price=100 + i,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=self.user if i else User.objects.create(username="other"),
+            )
+            for j in range(i):
+                Photo.objects.create(
+                    file=f"https://example.com/{i}-{j}.png",
+                    description=f"Photo {j}",
+                    room=room,
+                )
+            if i:
+                Review.objects.create(user=self.user, room=room, payload="a", rating=i)
+            self.rooms.append(room)
+        self.request = APIRequestFactory().get("/api/v1/rooms/")
+        self.request.user = self.user
+
+    def assertSameJSON(self, data, serializer_data):
+        # Compared as the bytes the API responds with.
+        renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+        self.assertEqual(renderer.render(data), renderer.render(serializer_data))
+
+    def test_room_list_data(self):
+        rooms = models.Room.objects.order_by("pk")
+        self.assertSameJSON(
+            room_list_data(list(rooms.for_list()), self.request),
+            RoomListSerializer(
+                rooms,
+                many=True,
+                context={"request": self.request},
+            ).data,
+        )
+
+    def test_room_booking_data(self):
+        Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.user,
+            room=self.rooms[1],
+            check_in="2030-01-10",
+            check_out="2030-01-15",
+            guests=2,
+        )
+        bookings = Booking.objects.order_by("pk")
+        self.assertSameJSON(
+            public_room_booking_data(bookings),
+            PublicRoomBookingSerializer(bookings, many=True).data,
+        )
+
+
+class TestGraphQLQueries(APITestCase):
+
+    QUERY = """
+    {
+        allRooms {
+            edges {
+                node {
+                    owner { name }
+                    rating
+                    isOwner
+                    isLiked
+                    reviews {
+                        totalCount
+                        pageInfo { hasNextPage endCursor }
+                        edges { node { rating } }
+                    }
+                }
+            }
+        }
+    }
+    """
+
+    def setUp(self):
+        self.user = User.objects.create(username="guest")
+
+    def create_rooms(self, count, **fields):
+        for i in range(count):
+            owner = User.objects.create(username=f"host {models.Room.objects.count()}")
+            room = models.Room.objects.create(
+                **{
+                    "name": f"Room {i}",
+                    "price": 100,
+                    "rooms": 1,
+                    "toilets": 1,
+                    "description": "desc",
+                    "address": "address",
+                    "kind": models.Room.RoomKindChoices.ENTIRE_PLACE,
+                    "owner": owner,
+                    **fields,
+                }
+            )
+            for rating in range(5):
+                Review.objects.create(
+                    user=self.user,
+                    room=room,
+                    payload="a",
+                    rating=rating,
+                )
+
+    def execute(self, query, variables=None):
+        response = self.client.post(
+            "/graphql",
+            {"query": query, "variables": variables or {}},
+            format="json",
+        )
+        return response.json()
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = self.execute(self.QUERY)
+        self.assertNotIn("errors", result)
+        return len(queries), [
+            edge["node"] for edge in result["data"]["allRooms"]["edges"]
+        ]
+
+    def test_query_count_does_not_grow_with_rooms(self):
+        self.client.force_login(self.user)
+        self.create_rooms(1)
+        few, _ = self.count_queries()
+        self.create_rooms(10)
+        many, rooms = self.count_queries()
+        self.assertEqual(few, many)
+        self.assertEqual(len(rooms), 11)
+        for room in rooms:
+            self.assertEqual(room["reviews"]["totalCount"], 5)
+            self.assertEqual(len(room["reviews"]["edges"]), 3)
+            self.assertTrue(room["reviews"]["pageInfo"]["hasNextPage"])
+            self.assertFalse(room["isOwner"])
+
+    def test_pagination(self):
+        self.create_rooms(5)
+        query = """
+        query ($after: String) {
+            allRooms(first: 2, after: $after) {
+                edges { node { id } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+        """
+        seen = []
+        after = None
+        while True:
+            page = self.execute(query, {"after": after})["data"]["allRooms"]
+            seen += [int(edge["node"]["id"]) for edge in page["edges"]]
+            if not page["pageInfo"]["hasNextPage"]:
+                break
+            after = page["pageInfo"]["endCursor"]
+        self.assertEqual(
+            seen,
+            list(
+                models.Room.objects.order_by("-created_at", "-pk").values_list(
+                    "pk", flat=True
+                )
+            ),
+        )
+
+        room = models.Room.objects.first()
+        query = """
+        query ($pk: Int!, $after: String) {
+            room(pk: $pk) {
+                reviews(first: 2, after: $after) {
+                    edges { node { rating } }
+                    pageInfo { endCursor }
+                }
+            }
+        }
+        """
+        first = self.execute(query, {"pk": room.pk})["data"]["room"]["reviews"]
+        second = self.execute(
+            query,
+            {"pk": room.pk, "after": first["pageInfo"]["endCursor"]},
+        )["data"]["room"]["reviews"]
+        self.assertEqual(
+            [edge["node"]["rating"] for edge in first["edges"] + second["edges"]],
+            [4, 3, 2, 1],
+        )
+
+    def test_filters(self):
+        self.create_rooms(2, city="부산", price=50)
+        self.create_rooms(2, city="서울", price=150)
+        self.create_rooms(1, city="서울", price=150, kind="shared_room")
+        query = """
+        query ($city: String, $kind: RoomKindChoices, $min: Int, $max: Int) {
+            allRooms(city: $city, kind: $kind, minPrice: $min, maxPrice: $max) {
+                edges { node { id } }
+            }
+        }
+        """
+
+        def count(**variables):
+            return len(self.execute(query, variables)["data"]["allRooms"]["edges"])
+
+        self.assertEqual(count(city="서울"), 3)
+        self.assertEqual(count(kind="SHARED_ROOM"), 1)
+        self.assertEqual(count(min=100), 3)
+        self.assertEqual(count(max=100), 2)
+        self.assertEqual(count(city="부산", min=100), 0)
+
+    def test_limits(self):
+        expensive = """
+        {
+            allRooms(first: 100) {
+                edges { node { reviews(first: 100) { edges { node { rating } } } } }
+            }
+        }
+        """
+        with CaptureQueriesContext(connection) as queries:
+            result = self.execute(expensive)
+        self.assertIn("costs", result["errors"][0]["message"])
+        self.assertFalse(
+            [query for query in queries if "rooms_room" in query["sql"]],
+        )
+
+        nested = "{ allRooms { edges { node { reviews { edges { node { id } } } } } } }"
+        self.assertNotIn("errors", self.execute(nested))
+
+
+class TestAsyncReadViews(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="host")
+        self.room = models.Room.objects.create(
+            name="Async Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        self.room.amenities.add(models.Amenity.objects.create(name="Wifi"))
+        Photo.objects.create(file="https://example.com/a.png", room=self.room)
+        Review.objects.create(user=self.user, room=self.room, payload="a", rating=4)
+        Booking.objects.create(
+            kind=Booking.BookingKindChoices.ROOM,
+            user=self.user,
+            room=self.room,
+            check_in="2030-01-10",
+            check_out="2030-01-15",
+            guests=1,
+        )
+        Wishlist.objects.create(name="Trip", user=self.user).rooms.add(self.room)
+
+    def get_both(self, url, **headers):
+        responses = []
+        for enabled in (True, False):
+            cache.clear()
+            with self.settings(ASYNC_READ_VIEWS=enabled):
+                response = self.client.get(url, headers=headers)
+            responses.append((response.status_code, response.json()))
+        return responses
+
+    def test_same_as_sync_views(self):
+        for url in (
+            "/api/v1/rooms/",
+            f"/api/v1/rooms/{self.room.pk}",
+            f"/api/v1/rooms/{self.room.pk}?fields=name,is_owner,is_liked",
+            f"/api/v1/rooms/{self.room.pk}/reviews",
+            f"/api/v1/rooms/{self.room.pk}/bookings/check?check_in=2030-01-12&check_out=2030-01-20",
+            f"/api/v1/rooms/{self.room.pk}/bookings/check?check_in=2030-02-12&check_out=2030-02-20",
+            "/api/v1/rooms/0",
+            "/api/v1/rooms/0/reviews",
+            f"/api/v1/rooms/{self.room.pk}?fields=nope",
+            "/api/v1/experiences/",
+        ):
+            for headers in ({}, {"Trust-Me": "host"}, {"Trust-Me": "nobody"}):
+                async_response, sync_response = self.get_both(url, **headers)
+                self.assertEqual(async_response, sync_response, (url, headers))
+
+        for url in ("/api/v1/rooms/?format=json", "/api/v1/rooms/?format=xml"):
+            async_response, sync_response = self.get_both(url)
+            self.assertEqual(async_response, sync_response, url)
+
+        response = self.client.get("/api/v1/rooms/?format=api")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+
+        _, data = self.get_both(
+            f"/api/v1/rooms/{self.room.pk}", **{"Trust-Me": "host"}
+        )[0]
+        self.assertTrue(data["is_owner"])
+        self.assertTrue(data["is_liked"])
+
+    def test_async_path_is_used(self):
+        with mock.patch.object(views.Rooms, "get", side_effect=AssertionError):
+            self.assertEqual(self.client.get("/api/v1/rooms/").status_code, 200)
+        self.assertEqual(self.client.post("/api/v1/rooms/").status_code, 403)
+
+    async def test_async_client(self):
+        response = await self.async_client.get(f"/api/v1/rooms/{self.room.pk}")
+        self.assertEqual(response.json()["name"], "Async Room")
+        etag = response.headers["ETag"]
+        response = await self.async_client.get(
+            f"/api/v1/rooms/{self.room.pk}",
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(response.status_code, 304)
+
+
+class TestRoomPhotoBatch(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="host")
+        self.room = models.Room.objects.create(
+            name="Photo Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=self.user,
+        )
+        Photo.objects.create(file="https://example.com/old.png", room=self.room)
+        self.url = f"/api/v1/rooms/{self.room.pk}/photos/batch"
+
+    def photos(self, count):
+        return [
+            {"file": f"https://example.com/{i}.png", "description": f"Photo {i}"}
+            for i in range(count)
+        ]
+
+    def files(self):
+        detail = self.client.get(f"/api/v1/rooms/{self.room.pk}").json()
+        return [photo["file"] for photo in detail["photos"]]
+
+    def test_attach_in_order(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url, {"photos": self.photos(30)}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 30)
+        self.assertEqual(
+            self.files(),
+            ["https://example.com/old.png"]
+            + [f"https://example.com/{i}.png" for i in range(30)],
+        )
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        self.client.force_login(self.user)
+        counts = []
+        for count in (1, 30):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    self.url, {"photos": self.photos(count)}, format="json"
+                )
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_cover(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            self.url, {"photos": self.photos(3), "cover": 2}, format="json"
+        )
+        self.assertEqual(
+            [photo["file"] for photo in response.json()],
+            [f"https://example.com/{i}.png" for i in (2, 0, 1)],
+        )
+        self.assertEqual(
+            self.files(),
+            [
+                "https://example.com/2.png",
+                "https://example.com/old.png",
+                "https://example.com/0.png",
+                "https://example.com/1.png",
+            ],
+        )
+
+    def test_invalid(self):
+        self.client.force_login(self.user)
+        for data in (
+            {"photos": []},
+            {"photos": self.photos(2), "cover": 2},
+            {"photos": [{"file": "nope", "description": "a"}] + self.photos(1)},
+            {"photos": self.photos(51)},
+        ):
+            response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, 400, data)
+        self.assertEqual(Photo.objects.count(), 1)
+
+    def test_not_owner(self):
+        self.client.force_login(User.objects.create(username="guest"))
+        response = self.client.post(self.url, {"photos": self.photos(2)}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Photo.objects.count(), 1)
+
+
+# Run the suite with DATABASE_URL=postgres://... to include these.
+@skipUnlessDBFeature("has_select_for_update")
+class TestConcurrentPhotoBatches(TransactionTestCase):
+
+    THREADS = 4
+
+    def test_positions_are_not_shared(self):
+        user = User.objects.create(username="host")
+        room = models.Room.objects.create(
+            name="Photo Room",
+            price=100,
+            rooms=1,
+            toilets=1,
+            description="desc",
+            address="address",
+            kind=models.Room.RoomKindChoices.ENTIRE_PLACE,
+            owner=user,
+        )
+        barrier = threading.Barrier(self.THREADS)
+
+        def attach(i):
+            barrier.wait()
+            try:
+                photos = [
+                    {"file": f"https://example.com/{i}-{j}.png", "description": ""}
+                    for j in range(5)
+                ]
+                attach_photos("room", room, photos)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.THREADS) as executor:
+            for future in [executor.submit(attach, i) for i in range(self.THREADS)]:
+                future.result()
+        positions = list(room.photos.values_list("position", flat=True))
+        self.assertEqual(sorted(positions), list(range(self.THREADS * 5)))
+
+
+class TestRoomAmenityWrites(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="host")
+        self.category = Category.objects.create(
+            name="Cabins", kind=Category.CategoryKindChoices.ROOMS
+        )
+        self.amenities = [
+            models.Amenity.objects.create(name=f"Amenity {i}") for i in range(20)
+        ]
+        self.client.force_login(self.user)
+
+    def room_data(self, amenities):
+        return {
+            "name": "Room",
+            "price": 100,
+            "rooms": 1,
+            "toilets": 1,
+            "description": "desc",
+            "address": "address",
+            "kind": "entire_place",
+            "category": self.category.pk,
+            "amenities": amenities,
+        }
+
+    def amenity_pks(self, room_pk):
+        return set(
+            models.Room.objects.get(pk=room_pk).amenities.values_list("pk", flat=True)
+        )
+
+    def test_create_and_update(self):
+        pks = [amenity.pk for amenity in self.amenities]
+        response = self.client.post(
+            "/api/v1/rooms/", self.room_data(pks[:10]), format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        room_pk = response.json()["id"]
+        self.assertEqual(self.amenity_pks(room_pk), set(pks[:10]))
+
+        # The amenity lookup and the diff take the same queries for 1 or 20
+        counts = []
+        for amenities in (pks[10:11], pks[:10]):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.put(
+                    f"/api/v1/rooms/{room_pk}",
+                    self.room_data(amenities),
+                    format="json",
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.amenity_pks(room_pk), set(amenities))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_missing_amenities(self):
+        pks = [self.amenities[0].pk, 998, 999]
+        response = self.client.post(
+            "/api/v1/rooms/", self.room_data(pks), format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Amenity not found: 998, 999")
+        self.assertFalse(models.Room.objects.exists())
+
+        response = self.client.post(
+            "/api/v1/rooms/", self.room_data(["a"]), format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TestImportRooms(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="host")
+        Category.objects.create(name="Cabins", kind=Category.CategoryKindChoices.ROOMS)
+        models.Amenity.objects.create(name="Wifi")
+        models.Amenity.objects.create(name="Kitchen")
+
+    def room(self, i, **fields):
+        return {
+            "name": f"Room {i}",
+            "price": 100 + i,
+            "rooms": 1,
+            "toilets": 1,
+            "description": "desc",
+            "address": "address",
+            "kind": "entire_place",
+            "owner": "host",
+            "category": "Cabins",
+            "amenities": ["Wifi", "Kitchen"],
+            **fields,
+        }
+
+    def run_import(self, suffix, content, *args):
+        with tempfile.NamedTemporaryFile("w", suffix=suffix) as file:
+            file.write(content)
+            file.flush()
+            stdout, stderr = StringIO(), StringIO()
+            call_command("import_rooms", file.name, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_jsonl(self):
+        rows = [self.room(i) for i in range(25)]
+        rows[3] = self.room(3, price=-1)
+        rows[7] = self.room(7, owner="nobody", amenities=["Wifi", "Pool"])
+        lines = [json.dumps(row) for row in rows] + ["not json"]
+        stdout, stderr = self.run_import(
+            ".jsonl", "\n".join(lines), "--batch-size", "10"
+        )
+        self.assertIn("Imported 23 rooms, rejected 3", stdout)
+        rejects = [json.loads(line) for line in stderr.splitlines()]
+        self.assertEqual([reject["line"] for reject in rejects], [4, 8, 26])
+        self.assertEqual(set(rejects[0]["errors"]), {"price"})
+        self.assertEqual(set(rejects[1]["errors"]), {"owner", "amenities"})
+        self.assertEqual(rejects[1]["errors"]["amenities"], ["No amenity Pool"])
+
+        self.assertEqual(models.Room.objects.count(), 23)
+        room = models.Room.objects.get(name="Room 24")
+        self.assertEqual(room.price, 124)
+        self.assertEqual(room.owner, self.user)
+        self.assertEqual(room.category.name, "Cabins")
+        self.assertEqual(
+            set(room.amenities.values_list("name", flat=True)), {"Wifi", "Kitchen"}
+        )
+
+    def count_queries(self, rows, batch_size):
+        lines = [json.dumps(self.room(i)) for i in range(rows)]
+        with CaptureQueriesContext(connection) as queries:
+            self.run_import(".jsonl", "\n".join(lines), "--batch-size", batch_size)
+        return len(queries)
+
+    def test_queries_per_batch(self):
+        # 2 lookups up front, then per batch a savepoint and its release,
+        # the rooms and their amenities, plus the owners not seen yet.
+        self.assertEqual(self.count_queries(10, 10), 2 + 1 + 4)
+        self.assertEqual(self.count_queries(40, 40), 2 + 1 + 4)
+        self.assertEqual(self.count_queries(40, 10), 2 + 1 + 4 * 4)
+
+    def test_ambiguous_amenity(self):
+        models.Amenity.objects.create(name="Wifi")
+        _, stderr = self.run_import(".jsonl", json.dumps(self.room(0)))
+        self.assertEqual(
+            json.loads(stderr)["errors"],
+            {"amenities": ["More than one amenity is named Wifi"]},
+        )
+        self.assertFalse(models.Room.objects.exists())
+
+    def test_copy_value(self):
+        self.assertEqual(
+            [copy_value(value) for value in (None, "", True, 3, "a\tb\\c\nd")],
+            ["\\N", "", "t", "3", "a\\tb\\\\c\\nd"],
+        )
+
+    @skipUnless(connection.vendor == "postgresql", "COPY is Postgres only")
+    def test_copy_without_max_guests(self):
+        row = self.room(0, description="")
+        stdout, _ = self.run_import(".jsonl", json.dumps(row))
+        self.assertIn("Imported 1 rooms, rejected 0", stdout)
+        room = models.Room.objects.get()
+        self.assertIsNone(room.max_guests)
+        self.assertEqual(room.amenities.count(), 2)
+
+    def test_csv(self):
+        content = (
+            "name,price,rooms,toilets,description,address,kind,owner,category,"
+            "amenities,max_guests,pet_friendly\n"
+            "Csv Room,80,2,1,desc,address,private_room,host,Cabins,Wifi|Kitchen,,false\n"
+            "Bad Room,80,2,1,desc,address,castle,host,Cabins,,,\n"
+        )
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl") as rejects:
+            stdout, _ = self.run_import(".csv", content, "--rejects", rejects.name)
+            with open(rejects.name) as file:
+                rejected = [json.loads(line) for line in file]
+        self.assertIn("Imported 1 rooms, rejected 1", stdout)
+        self.assertEqual(rejected[0]["line"], 3)
+        self.assertEqual(set(rejected[0]["errors"]), {"kind"})
+        room = models.Room.objects.get()
+        self.assertIsNone(room.max_guests)
+        self.assertFalse(room.pet_friendly)
+        self.assertEqual(room.amenities.count(), 2)
@@ -1,12 +1,14 @@
-from django.conf import settings
 import strawberry
 from strawberry import auto
 from strawberry.types import Info
 import typing
+from django.conf import settings
 from . import models
-from wishlists.models import Wishlist
+from wishlists.liked import is_room_liked
 from users.types import UserType
-from reviews.types import ReviewType
+from reviews.types import ReviewConnection
+from common.pagination import bound_page_size, paginate_queryset, split_page
+from common.types import make_connection
 
 
 @strawberry.django.type(models.Room)
@@ -14,14 +16,36 @@ class RoomType:
     id: auto
     name: auto
     kind: auto
-    owner: "UserType"
 
     @strawberry.field
-    def reviews(self, page: typing.Optional[int] = 1) -> typing.List["ReviewType"]:
-        page_size = settings.PAGE_SIZE
-        start = (page - 1) * page_size
-        end = start + page_size
-        return self.reviews.all()[start:end]
+    def owner(self, info: Info) -> UserType:
+        return info.context.loaders.users.load(self.owner_id)
+
+    @strawberry.field
+    def reviews(
+        self,
+        info: Info,
+        first: int = settings.PAGE_SIZE,
+        after: typing.Optional[str] = None,
+    ) -> ReviewConnection:
+        first = bound_page_size(first)
+        if after:
+            reviews, next_cursor = paginate_queryset(
+                self.reviews.all(),
+                cursor=after,
+                page_size=first,
+            )
+        else:
+            reviews, next_cursor = split_page(
+                info.context.loaders.room_reviews(first).load(self.pk),
+                first,
+            )
+        return make_connection(
+            ReviewConnection,
+            reviews,
+            next_cursor,
+            total_count=self.review_count,
+        )
 
     @strawberry.field
     def rating(self) -> str:
@@ -29,11 +53,8 @@ class RoomType:
 
     @strawberry.field
     def is_owner(self, info: Info) -> bool:
-        return self.owner == info.context.request.user
+        return self.owner_id == info.context.request.user.pk
 
     @strawberry.field
     def is_liked(self, info: Info) -> bool:
-        return Wishlist.objects.filter(
-            user=info.context.request.user,
-            rooms__pk=self.pk,
-        ).exists()
+        return is_room_liked(info.context.request, self)
@@ -2,14 +2,17 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("", views.Rooms.as_view()),
-    path("<int:pk>", views.RoomDetail.as_view()),
-    path("<int:pk>/reviews", views.RoomReviews.as_view()),
+    path("", views.AsyncRooms.as_view()),
+    path("search", views.RoomSearch.as_view()),
+    path("<int:pk>", views.AsyncRoomDetail.as_view()),
+    path("<int:pk>/reviews", views.AsyncRoomReviews.as_view()),
     path("<int:pk>/amenities", views.RoomAmenities.as_view()),
     path("<int:pk>/photos", views.RoomPhotos.as_view()),
+    path("<int:pk>/photos/batch", views.RoomPhotoBatch.as_view()),
     path("<int:pk>/bookings", views.RoomBookingList.as_view()),
-    path("<int:pk>/bookings/check", views.RoomBookingCheck.as_view()),
+    path("<int:pk>/bookings/check", views.AsyncRoomBookingCheck.as_view()),
     path("<int:pk>/bookings/<int:booking_pk>", views.RoomBooking.as_view()),
+    path("<int:pk>/availability", views.RoomAvailability.as_view()),
     path("amenities/", views.Amenities.as_view()),
     path("amenities/<int:pk>", views.AmenityDetail.as_view()),
     path("make-error", views.make_error),
@@ -1,7 +1,10 @@
+from datetime import date, timedelta
+
 # django
 from django.conf import settings
 from django.utils import timezone
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 
 # django rest framework
 from rest_framework.views import APIView
@@ -10,23 +13,45 @@ from rest_framework.exceptions import NotFound, ParseError, PermissionDenied
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.status import HTTP_204_NO_CONTENT, HTTP_400_BAD_REQUEST
 
+# pagination, caching and conditional requests
+from common.pagination import apaginate, paginate
+from common.cache import aget_cached, aget_version, get_cached, get_version
+from common.serializers import get_sparse_fields, resolve_related, sparse_key
+from common.conditional import (
+    aconditional,
+    aggregate_validators,
+    apage_validators,
+    conditional,
+    page_validators,
+)
+from common.views import AsyncReadView
+from wishlists.liked import aload_liked, load_liked
+
 # models
 from .models import Amenity, Room
 from categories.models import Category
 from bookings.models import Booking
 
 # serializers
-from .serializers import AmenitySerializer, RoomListSerializer, RoomDetailSerializer
+from .serializers import AmenitySerializer, RoomDetailSerializer, room_list_data
 from reviews.serializers import ReviewSerializer
-from medias.serializers import PhotoSerializer
+from medias.photos import attach_photos, next_position
+from medias.serializers import PhotoBatchSerializer, PhotoSerializer, aphoto_data_by
 from bookings.serializers import (
+    BookingConflict,
+    is_overlap_violation,
     PublicRoomBookingSerializer,
     CreateRoomBookingSerializer,
+    public_room_booking_data,
 )
 
 
 class Amenities(APIView):
 
+    def get_validators(self, request):
+        return aggregate_validators(Amenity.objects.all())
+
+    @conditional(get_validators)
     def get(self, request):
         all_amenities = Amenity.objects.all()
         serializer = AmenitySerializer(all_amenities, many=True)
@@ -85,14 +110,27 @@ class Rooms(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def get_validators(self, request):
+        return page_validators(
+            request,
+            Room.objects.all(),
+            settings.LIST_PAGE_SIZE,
+            request.user.pk,
+        )
+
+    @conditional(get_validators)
     def get(self, request):
-        all_rooms = Room.objects.all()
-        serializer = RoomListSerializer(
-            all_rooms,
-            many=True,
-            context={"request": request},
+        rooms, next_cursor = paginate(
+            request,
+            Room.objects.for_list(),
+            page_size=settings.LIST_PAGE_SIZE,
+        )
+        return Response(
+            {
+                "results": room_list_data(rooms, request),
+                "next": next_cursor,
+            }
         )
-        return Response(serializer.data)
 
     def post(self, request):
         serializer = RoomDetailSerializer(data=request.data)
@@ -106,24 +144,23 @@ class Rooms(APIView):
                     raise ParseError("Category kind should be 'rooms'")
             except Category.DoesNotExist:
                 raise ParseError("Category not found")
-            try:
-                with transaction.atomic():
-                    room = serializer.save(
-                        owner=request.user,
-                        category=category,
-                    )
-                    amenities = request.data.get("amenities")
-                    for amenity_pk in amenities:
-                        amenity = Amenity.objects.get(pk=amenity_pk)
-                        room.amenities.add(amenity)
-                    return Response(
-                        RoomDetailSerializer(
-                            room,
-                            context={"request": request},
-                        ).data
-                    )
-            except Exception:
-                raise ParseError("Amenity not found")
+            amenities = resolve_related(
+                Amenity.objects.all(),
+                request.data.get("amenities"),
+                "Amenity",
+            )
+            with transaction.atomic():
+                room = serializer.save(
+                    owner=request.user,
+                    category=category,
+                    amenities=amenities,
+                )
+            return Response(
+                RoomDetailSerializer(
+                    room,
+                    context={"request": request},
+                ).data
+            )
         else:
             return Response(
                 serializer.errors,
@@ -131,6 +168,77 @@ class Rooms(APIView):
             )
 
 
+class RoomSearch(APIView):
+
+    def get_date(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ParseError(f"Invalid {name} date")
+
+    def get_int(self, request, name):
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ParseError(f"Invalid {name}")
+
+    def get(self, request):
+        rooms = Room.objects.for_list()
+
+        check_in = self.get_date(request, "check_in")
+        check_out = self.get_date(request, "check_out")
+        if check_in or check_out:
+            if not check_in or not check_out:
+                raise ParseError("Both check_in and check_out are required")
+            if check_out <= check_in:
+                raise ParseError("Check in should be smaller than check out.")
+            rooms = rooms.available(check_in, check_out)
+
+        for name in ("country", "city", "kind"):
+            value = request.query_params.get(name)
+            if value:
+                rooms = rooms.filter(**{name: value})
+
+        guests = self.get_int(request, "guests")
+        if guests:
+            rooms = rooms.filter(
+                Q(max_guests__isnull=True) | Q(max_guests__gte=guests),
+            )
+        min_price = self.get_int(request, "min_price")
+        if min_price is not None:
+            rooms = rooms.filter(price__gte=min_price)
+        max_price = self.get_int(request, "max_price")
+        if max_price is not None:
+            rooms = rooms.filter(price__lte=max_price)
+
+        amenities = request.query_params.get("amenities")
+        if amenities:
+            try:
+                amenity_pks = {int(pk) for pk in amenities.split(",")}
+            except ValueError:
+                raise ParseError("Invalid amenities")
+            for amenity_pk in amenity_pks:
+                rooms = rooms.filter(amenities=amenity_pk)
+
+        rooms, next_cursor = paginate(
+            request,
+            rooms,
+            page_size=settings.LIST_PAGE_SIZE,
+        )
+        return Response(
+            {
+                "results": room_list_data(rooms, request),
+                "next": next_cursor,
+            }
+        )
+
+
 class RoomDetail(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
@@ -141,13 +249,48 @@ class RoomDetail(APIView):
         except Room.DoesNotExist:
             raise NotFound
 
+    def build_detail(self, pk, fields=None):
+        rooms = RoomDetailSerializer.load_queryset(Room.objects.all(), fields)
+        try:
+            room = rooms.get(pk=pk)
+        except Room.DoesNotExist:
+            raise NotFound
+        return {
+            "owner_id": room.owner_id,
+            "data": RoomDetailSerializer(room, fields=fields).data,
+        }
+
+    @staticmethod
+    def make_etag(request, pk, version, liked):
+        fields = get_sparse_fields(request, RoomDetailSerializer)
+        return f"room-{pk}-{version}:{request.user.pk}:{liked}:{sparse_key(fields)}"
+
+    @staticmethod
+    def viewer_data(request, cached, liked):
+        data = dict(cached["data"])
+        if "is_owner" in data:
+            data["is_owner"] = cached["owner_id"] == request.user.pk
+        if "is_liked" in data:
+            data["is_liked"] = liked
+        return data
+
+    def get_validators(self, request, pk):
+        liked = pk in load_liked(request)["rooms"]
+        return self.make_etag(request, pk, get_version("room", pk), liked), None
+
+    @conditional(get_validators)
     def get(self, request, pk):
-        room = self.get_object(pk)
-        serializer = RoomDetailSerializer(
-            room,
-            context={"request": request},
+        fields = get_sparse_fields(request, RoomDetailSerializer)
+        # The viewer-independent part is cached until the room or anything
+        # nested in it changes (see rooms/signals.py).
+        cached = get_cached(
+            "room",
+            pk,
+            lambda: self.build_detail(pk, fields),
+            variant=sparse_key(fields),
         )
-        return Response(serializer.data)
+        liked = pk in load_liked(request)["rooms"]
+        return Response(self.viewer_data(request, cached, liked))
 
     def put(self, request, pk):
         room = self.get_object(pk)
@@ -170,17 +313,11 @@ class RoomDetail(APIView):
             except Category.DoesNotExist:
                 raise NotFound("Category not found")
 
-            amenity_pks = request.data.get("amenities")
-            amenities = []
-            if not amenity_pks:
-                amenity_pks = []
-            try:
-                for amenity_pk in amenity_pks:
-                    amenity = Amenity.objects.get(pk=amenity_pk)
-                    amenities.append(amenity)
-            except Amenity.DoesNotExist:
-                raise ParseError("Amenity not found")
-
+            amenities = resolve_related(
+                Amenity.objects.all(),
+                request.data.get("amenities"),
+                "Amenity",
+            )
             updated_room = serializer.save(
                 category=category,
                 amenities=amenities,
@@ -217,20 +354,19 @@ class RoomReviews(APIView):
             raise NotFound
 
     def get(self, request, pk):
-        try:
-            page = request.query_params.get("page", 1)
-            page = int(page)
-        except ValueError:
-            page = 1
-        page_size = settings.PAGE_SIZE
-        start = (page - 1) * page_size
-        end = start + page_size
         room = self.get_object(pk)
+        reviews, next_cursor = paginate(request, room.reviews.select_related("user"))
         serializer = ReviewSerializer(
-            room.reviews.all()[start:end],
+            reviews,
             many=True,
         )
-        return Response(serializer.data)
+        return Response(
+            {
+                "results": serializer.data,
+                "next": next_cursor,
+                "count": room.review_count,
+            }
+        )
 
     def post(self, request, pk):
         serializer = ReviewSerializer(data=request.data)
@@ -256,20 +392,19 @@ class RoomAmenities(APIView):
             raise NotFound
 
     def get(self, request, pk):
-        try:
-            page = request.query_params.get("page", 1)
-            page = int(page)
-        except ValueError:
-            page = 1
-        page_size = settings.PAGE_SIZE
-        start = (page - 1) * page_size
-        end = start + page_size
         room = self.get_object(pk)
+        amenities, next_cursor = paginate(request, room.amenities.all())
         serializer = AmenitySerializer(
-            room.amenities.all()[start:end],
+            amenities,
             many=True,
         )
-        return Response(serializer.data)
+        return Response(
+            {
+                "results": serializer.data,
+                "next": next_cursor,
+                "count": room.amenities.count(),
+            }
+        )
 
 
 class RoomPhotos(APIView):
@@ -289,9 +424,11 @@ class RoomPhotos(APIView):
         serializer = PhotoSerializer(data=request.data)
 
         if serializer.is_valid():
-            photo = serializer.save(
-                room=room,
-            )
+            with transaction.atomic():
+                photo = serializer.save(
+                    room=room,
+                    position=next_position("room", room),
+                )
             return Response(PhotoSerializer(photo).data)
         else:
             return Response(
@@ -300,13 +437,44 @@ class RoomPhotos(APIView):
             )
 
 
-class RoomBookingList(APIView):
+class RoomPhotoBatch(APIView):
 
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_object(self, pk):
         try:
             return Room.objects.get(pk=pk)
+        except Room.DoesNotExist:
+            raise NotFound
+
+    def post(self, request, pk):
+        room = self.get_object(pk)
+        if request.user.pk != room.owner_id:
+            raise PermissionDenied
+        serializer = PhotoBatchSerializer(data=request.data)
+        if serializer.is_valid():
+            photos = attach_photos(
+                "room",
+                room,
+                serializer.validated_data["photos"],
+                cover=serializer.validated_data.get("cover"),
+            )
+            return Response(PhotoSerializer(photos, many=True).data)
+        else:
+            return Response(
+                serializer.errors,
+                status=HTTP_400_BAD_REQUEST,
+            )
+
+
+class RoomBookingList(APIView):
+
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get_object(self, pk, lock=False):
+        rooms = Room.objects.select_for_update() if lock else Room.objects
+        try:
+            return rooms.get(pk=pk)
         except Room.DoesNotExist:
             raise NotFound("Room not found")
 
@@ -318,38 +486,42 @@ class RoomBookingList(APIView):
             kind=Booking.BookingKindChoices.ROOM,
             check_in__gt=now,
         ).order_by("check_in")
-        serializer = PublicRoomBookingSerializer(
-            bookings,
-            many=True,
-        )
-        return Response(serializer.data)
+        return Response(public_room_booking_data(bookings))
 
     def post(self, request, pk):
-        room = self.get_object(pk)
-        serializer = CreateRoomBookingSerializer(
-            data=request.data,
-            context={"room": room},
-        )
-        if serializer.is_valid():
-            booking = serializer.save(
-                room=room,
-                user=request.user,
-                kind=Booking.BookingKindChoices.ROOM,
-            )
-            return Response(PublicRoomBookingSerializer(booking).data)
-        else:
-            return Response(
-                serializer.errors,
-                status=HTTP_400_BAD_REQUEST,
-            )
+        try:
+            # Locking the room serializes bookings for it, so the overlap
+            # check in the serializer can't race another request.
+            with transaction.atomic():
+                room = self.get_object(pk, lock=True)
+                serializer = CreateRoomBookingSerializer(
+                    data=request.data,
+                    context={"room": room},
+                )
+                if not serializer.is_valid():
+                    return Response(
+                        serializer.errors,
+                        status=HTTP_400_BAD_REQUEST,
+                    )
+                booking = serializer.save(
+                    room=room,
+                    user=request.user,
+                    kind=Booking.BookingKindChoices.ROOM,
+                )
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            raise BookingConflict
+        return Response(PublicRoomBookingSerializer(booking).data)
 
 
 class RoomBooking(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-    def get_object(self, pk):
+    def get_object(self, pk, lock=False):
+        rooms = Room.objects.select_for_update() if lock else Room.objects
         try:
-            return Room.objects.get(pk=pk)
+            return rooms.get(pk=pk)
         except Room.DoesNotExist:
             raise NotFound("Room not found")
 
@@ -379,25 +551,30 @@ class RoomBooking(APIView):
         if request.data.get("experience_time"):
             raise ParseError("Experience time is only for experience bookings.")
 
-        room = self.get_object(pk)
-        booking = self.get_booking(booking_pk, room)
-        serializer = CreateRoomBookingSerializer(
-            booking,
-            data=request.data,
-            partial=True,
-            context={
-                "pk": booking_pk,
-                "room": room,
-            },
-        )
-        if serializer.is_valid():
-            updated_booking = serializer.save()
-            return Response(PublicRoomBookingSerializer(updated_booking).data)
-        else:
-            return Response(
-                serializer.errors,
-                status=HTTP_400_BAD_REQUEST,
-            )
+        try:
+            with transaction.atomic():
+                room = self.get_object(pk, lock=True)
+                booking = self.get_booking(booking_pk, room)
+                serializer = CreateRoomBookingSerializer(
+                    booking,
+                    data=request.data,
+                    partial=True,
+                    context={
+                        "pk": booking_pk,
+                        "room": room,
+                    },
+                )
+                if not serializer.is_valid():
+                    return Response(
+                        serializer.errors,
+                        status=HTTP_400_BAD_REQUEST,
+                    )
+                updated_booking = serializer.save()
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            raise BookingConflict
+        return Response(PublicRoomBookingSerializer(updated_booking).data)
 
 
 class RoomBookingCheck(APIView):
@@ -412,15 +589,185 @@ class RoomBookingCheck(APIView):
         room = self.get_object(pk)
         check_in = request.query_params.get("check_in")
         check_out = request.query_params.get("check_out")
-        exists = Booking.objects.filter(
-            check_in__lte=check_out,
-            check_out__gte=check_in,
-            room=room,
+        exists = Booking.objects.overlapping(
+            room,
+            check_in,
+            check_out,
         ).exists()
         if exists:
             return Response({"ok": False})
         return Response({"ok": True})
 
 
+class RoomAvailability(APIView):
+
+    MAX_DAYS = 366
+
+    def get_object(self, pk):
+        try:
+            return Room.objects.get(pk=pk)
+        except Room.DoesNotExist:
+            raise NotFound("Room not found")
+
+    def get_date(self, request, name, default):
+        value = request.query_params.get(name)
+        if not value:
+            return default
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ParseError(f"Invalid {name} date")
+
+    def get(self, request, pk):
+        room = self.get_object(pk)
+        start = self.get_date(
+            request,
+            "from",
+            timezone.localtime(timezone.now()).date(),
+        )
+        end = self.get_date(
+            request,
+            "to",
+            start + timedelta(days=self.MAX_DAYS - 1),
+        )
+        if end < start:
+            raise ParseError("'to' should not be before 'from'")
+        if (end - start).days >= self.MAX_DAYS:
+            raise ParseError(f"The window can be at most {self.MAX_DAYS} days")
+
+        # Merge bookings into blocked runs, clipped to the window.
+        blocked = []
+        for check_in, check_out in (
+            Booking.objects.overlapping(room, start, end)
+            .order_by("check_in")
+            .values_list("check_in", "check_out")
+        ):
+            check_in = max(check_in, start)
+            check_out = min(check_out, end)
+            if blocked and check_in <= blocked[-1][1] + timedelta(days=1):
+                blocked[-1][1] = max(blocked[-1][1], check_out)
+            else:
+                blocked.append([check_in, check_out])
+        return Response(
+            {
+                "from": start,
+                "to": end,
+                "blocked": blocked,
+            }
+        )
+
+
 def make_error(request):
     division_by_zero = 1 / 0
+
+
+class AsyncRooms(AsyncReadView):
+
+    api_view = Rooms
+
+    async def get_validators(self, request):
+        return await apage_validators(
+            request,
+            Room.objects.all(),
+            settings.LIST_PAGE_SIZE,
+            request.user.pk,
+        )
+
+    @aconditional(get_validators)
+    async def get(self, request):
+        rooms, next_cursor = await apaginate(
+            request,
+            Room.objects.for_list(),
+            page_size=settings.LIST_PAGE_SIZE,
+        )
+        photos = await aphoto_data_by("room_id", [room["pk"] for room in rooms])
+        return Response(
+            {
+                "results": room_list_data(rooms, request, photos),
+                "next": next_cursor,
+            }
+        )
+
+
+class AsyncRoomDetail(AsyncReadView):
+
+    api_view = RoomDetail
+
+    async def build_detail(self, pk, fields=None):
+        rooms = RoomDetailSerializer.load_queryset(Room.objects.all(), fields)
+        try:
+            room = await rooms.aget(pk=pk)
+        except Room.DoesNotExist:
+            raise NotFound
+        return {
+            "owner_id": room.owner_id,
+            "data": RoomDetailSerializer(room, fields=fields).data,
+        }
+
+    async def get_validators(self, request, pk):
+        liked = pk in (await aload_liked(request))["rooms"]
+        version = await aget_version("room", pk)
+        return RoomDetail.make_etag(request, pk, version, liked), None
+
+    @aconditional(get_validators)
+    async def get(self, request, pk):
+        fields = get_sparse_fields(request, RoomDetailSerializer)
+        cached = await aget_cached(
+            "room",
+            pk,
+            lambda: self.build_detail(pk, fields),
+            variant=sparse_key(fields),
+        )
+        liked = pk in (await aload_liked(request))["rooms"]
+        return Response(RoomDetail.viewer_data(request, cached, liked))
+
+
+class AsyncRoomReviews(AsyncReadView):
+
+    api_view = RoomReviews
+
+    async def get_object(self, pk):
+        try:
+            return await Room.objects.aget(pk=pk)
+        except Room.DoesNotExist:
+            raise NotFound
+
+    async def get(self, request, pk):
+        room = await self.get_object(pk)
+        reviews, next_cursor = await apaginate(
+            request,
+            room.reviews.select_related("user"),
+        )
+        serializer = ReviewSerializer(
+            reviews,
+            many=True,
+        )
+        return Response(
+            {
+                "results": serializer.data,
+                "next": next_cursor,
+                "count": room.review_count,
+            }
+        )
+
+
+class AsyncRoomBookingCheck(AsyncReadView):
+
+    api_view = RoomBookingCheck
+
+    async def get_object(self, pk):
+        try:
+            return await Room.objects.aget(pk=pk)
+        except Room.DoesNotExist:
+            raise NotFound("Room not found")
+
+    async def get(self, request, pk):
+        room = await self.get_object(pk)
+        check_in = request.query_params.get("check_in")
+        check_out = request.query_params.get("check_out")
+        exists = await Booking.objects.overlapping(
+            room,
+            check_in,
+            check_out,
+        ).aexists()
+        return Response({"ok": not exists})
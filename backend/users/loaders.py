@@ -0,0 +1,5 @@
+from .models import User
+
+
+def load_users(pks):
+    return User.objects.in_bulk(pks)
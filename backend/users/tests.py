@@ -1,3 +1,131 @@
-from django.test import TestCase
+import jwt
+from django.conf import settings
+from rest_framework.test import APITestCase
+from config.authentication import UserCache, user_cache
+from common.http import http
+from common.testing import FakeUpstream
+from .models import User
 
-# Create your tests here.
+
+class TestAuthenticationCache(APITestCase):
+
+    URL = "/api/v1/users/me"
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create(username="cached", name="Before")
+        self.token = jwt.encode(
+            {"pk": self.user.pk},
+            settings.SECRET_KEY,
+            algorithm="HS256",
+        )
+
+    def get_me(self):
+        return self.client.get(self.URL, headers={"Jwt": self.token})
+
+    def test_jwt_user_is_cached(self):
+        self.assertEqual(self.get_me().status_code, 200)
+        with self.assertNumQueries(0):
+            response = self.get_me()
+        self.assertEqual(response.json()["username"], "cached")
+        stats = user_cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_saving_user_invalidates(self):
+        self.get_me()
+        self.user.name = "After"
+        self.user.save()
+        self.assertEqual(self.get_me().json()["name"], "After")
+        self.assertEqual(user_cache.stats()["misses"], 2)
+
+    def test_stats_are_logged(self):
+        cache = UserCache(max_size=10, ttl=60, report_every=60)
+        cache.lookup("missing")
+        cache.store("cached", self.user)
+        cache.lookup("cached")
+        cache.next_report = 0
+        with self.assertLogs("config.authentication", "INFO") as logs:
+            cache.lookup("cached")
+        self.assertIn("2 hits, 1 misses, 66.7% hit rate, 1 entries", logs.output[0])
+        with self.assertNoLogs("config.authentication"):
+            cache.lookup("cached")
+
+    def test_trust_me(self):
+        headers = {"Trust-Me": "cached"}
+        self.assertEqual(self.client.get(self.URL, headers=headers).status_code, 200)
+        with self.assertNumQueries(0):
+            self.client.get(self.URL, headers=headers)
+        response = self.client.get(self.URL, headers={"Trust-Me": "nobody"})
+        self.assertEqual(response.status_code, 403)
+
+
+class TestSocialLogIn(APITestCase):
+
+    def setUp(self):
+        http.reset()
+
+    def test_github(self):
+        routes = {
+            ("POST", "/login/oauth/access_token"): lambda request: (
+                200,
+                {"access_token": "token"},
+            ),
+            ("GET", "/user"): lambda request: (
+                200,
+                {"login": "octocat", "id": 1, "name": None, "avatar_url": "a"},
+                0.3,
+            ),
+            ("GET", "/user/emails"): lambda request: (
+                200,
+                [{"email": "octocat@example.com"}],
+                0.3,
+            ),
+        }
+        with FakeUpstream(routes) as fake:
+            with self.settings(GITHUB_URL=fake.url, GITHUB_API_URL=fake.url):
+                response = self.client.post("/api/v1/users/github", {"code": "c"})
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(email="octocat@example.com")
+        self.assertEqual(user.username, "octocat_1")
+        self.assertEqual(user.name, "No Name")
+
+        token = fake.calls("/login/oauth/access_token")[0]
+        self.assertEqual(token["query"]["code"], ["c"])
+        user_call, emails_call = fake.calls("/user")[0], fake.calls("/user/emails")[0]
+        self.assertEqual(user_call["headers"]["Authorization"], "Bearer token")
+        # The two API calls ran at the same time.
+        self.assertLess(abs(user_call["started"] - emails_call["started"]), 0.2)
+
+    def test_kakao(self):
+        routes = {
+            ("POST", "/oauth/token"): lambda request: (
+                200,
+                {"access_token": "token"},
+            ),
+            ("GET", "/v2/user/me"): lambda request: (
+                200,
+                {
+                    "id": 7,
+                    "kakao_account": {
+                        "email": "kakao@example.com",
+                        "profile": {"nickname": "라이언", "profile_image_url": "a"},
+                    },
+                },
+            ),
+        }
+        with FakeUpstream(routes) as fake:
+            with self.settings(KAKAO_AUTH_URL=fake.url, KAKAO_API_URL=fake.url):
+                response = self.client.post("/api/v1/users/kakao", {"code": "c"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            User.objects.get(email="kakao@example.com").username,
+            "라이언_7",
+        )
+
+    def test_upstream_down(self):
+        routes = {("POST", "/login/oauth/access_token"): lambda request: (503, {})}
+        with FakeUpstream(routes) as fake:
+            with self.settings(GITHUB_URL=fake.url, GITHUB_API_URL=fake.url):
+                response = self.client.post("/api/v1/users/github", {"code": "c"})
+        self.assertEqual(response.status_code, 400)
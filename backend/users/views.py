@@ -1,7 +1,7 @@
 import jwt
 from django.conf import settings
 from django.contrib.auth import authenticate, login, logout
-import requests
+from common.http import concurrently, http
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
@@ -154,26 +154,28 @@ class GithubLogIn(APIView):
     def post(self, request):
         try:
             code = request.data.get("code")
-            access_token = requests.post(
-                f"https://github.com/login/oauth/access_token?code={code}&client_id=Ov23liGJhHWRFlGjIE2l&client_secret={settings.GH_SECRET}",
+            access_token = http.post(
+                f"{settings.GITHUB_URL}/login/oauth/access_token",
+                params={
+                    "code": code,
+                    "client_id": "Ov23liGJhHWRFlGjIE2l",
+                    "client_secret": settings.GH_SECRET,
+                },
                 headers={"Accept": "application/json"},
             )
             access_token = access_token.json().get("access_token")
-            user_data = requests.get(
-                "https://api.github.com/user",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/json",
-                },
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "Accept": "application/json",
+            }
+            user_data, user_emails = concurrently(
+                lambda: http.get(f"{settings.GITHUB_API_URL}/user", headers=headers),
+                lambda: http.get(
+                    f"{settings.GITHUB_API_URL}/user/emails",
+                    headers=headers,
+                ),
             )
             user_data = user_data.json()
-            user_emails = requests.get(
-                "https://api.github.com/user/emails",
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Accept": "application/json",
-                },
-            )
             user_emails = user_emails.json()
             try:
                 user = User.objects.get(email=user_emails[0]["email"])
@@ -199,8 +201,8 @@ class KakaoLogIn(APIView):
     def post(self, request):
         try:
             code = request.data.get("code")
-            access_token = requests.post(
-                "https://kauth.kakao.com/oauth/token",
+            access_token = http.post(
+                f"{settings.KAKAO_AUTH_URL}/oauth/token",
                 headers={
                     "Content-type": "application/x-www-form-urlencoded;charset=utf-8"
                 },
@@ -212,8 +214,8 @@ class KakaoLogIn(APIView):
                 },
             )
             access_token = access_token.json().get("access_token")
-            user_data = requests.get(
-                "https://kapi.kakao.com/v2/user/me",
+            user_data = http.get(
+                f"{settings.KAKAO_API_URL}/v2/user/me",
                 headers={
                     "Authorization": f"Bearer {access_token}",
                     "Content-type": "application/x-www-form-urlencoded;charset=utf-8",
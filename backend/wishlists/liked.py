@@ -0,0 +1,57 @@
+from django.db.models import CharField, Value
+from .models import Wishlist
+
+
+def load_liked(request):
+    """Room and experience pks in the viewer's wishlists.
+
+    Loaded with one query the first time it is asked for and cached on the
+    underlying HttpRequest, so DRF serializers and GraphQL resolvers that run
+    during the same request share it.
+    """
+
+    request = getattr(request, "_request", request)
+    liked = getattr(request, "_liked_pks", None)
+    if liked is None:
+        liked = {"rooms": set(), "experiences": set()}
+        if request.user.is_authenticated:
+            for kind, pk in liked_rows(request.user):
+                liked[kind].add(pk)
+        request._liked_pks = liked
+    return liked
+
+
+async def aload_liked(request):
+    """load_liked() with the async ORM"""
+
+    request = getattr(request, "_request", request)
+    liked = getattr(request, "_liked_pks", None)
+    if liked is None:
+        liked = {"rooms": set(), "experiences": set()}
+        if request.user.is_authenticated:
+            async for kind, pk in liked_rows(request.user):
+                liked[kind].add(pk)
+        request._liked_pks = liked
+    return liked
+
+
+def liked_rows(user):
+    rooms = (
+        Wishlist.rooms.through.objects.filter(wishlist__user=user)
+        .annotate(kind=Value("rooms", output_field=CharField()))
+        .values_list("kind", "room_id")
+    )
+    experiences = (
+        Wishlist.experiences.through.objects.filter(wishlist__user=user)
+        .annotate(kind=Value("experiences", output_field=CharField()))
+        .values_list("kind", "experience_id")
+    )
+    return rooms.union(experiences, all=True)
+
+
+def is_room_liked(request, room):
+    return room.pk in load_liked(request)["rooms"]
+
+
+def is_experience_liked(request, experience):
+    return experience.pk in load_liked(request)["experiences"]
@@ -1,3 +1,52 @@
-from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rooms.models import Room
+from users.models import User
+from .models import Wishlist
 
-# Create your tests here.
+
+class TestIsLiked(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username="liker")
+        self.rooms = [
+            Room.objects.create(
+                name=f"Room {i}",
+                price=100,
+                rooms=1,
+                toilets=1,
+                description="desc",
+                address="address",
+                kind=Room.RoomKindChoices.ENTIRE_PLACE,
+                owner=self.user,
+            )
+            for i in range(3)
+        ]
+        wishlist = Wishlist.objects.create(name="Trip", user=self.user)
+        wishlist.rooms.add(self.rooms[0])
+
+    def test_room_detail(self):
+        self.client.force_login(self.user)
+        liked = self.client.get(f"/api/v1/rooms/{self.rooms[0].pk}").json()
+        self.assertTrue(liked["is_liked"])
+        other = self.client.get(f"/api/v1/rooms/{self.rooms[1].pk}").json()
+        self.assertFalse(other["is_liked"])
+
+    def test_graphql_loads_wishlists_once(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/graphql",
+                {"query": "{ allRooms { edges { node { id isLiked } } } }"},
+                format="json",
+            )
+        edges = response.json()["data"]["allRooms"]["edges"]
+        self.assertEqual(
+            {int(edge["node"]["id"]): edge["node"]["isLiked"] for edge in edges},
+            {room.pk: room == self.rooms[0] for room in self.rooms},
+        )
+        wishlist_queries = [
+            query for query in queries if "wishlists_wishlist" in query["sql"]
+        ]
+        self.assertEqual(len(wishlist_queries), 1)
@@ -13,7 +13,7 @@ const instance = axios.create({
 });
 
 export const getRooms = () =>
-  instance.get("rooms/").then((response) => response.data);
+  instance.get("rooms/").then((response) => response.data.results);
 
 export const getRoom = async ({ queryKey }: QueryFunctionContext) => {
   const [_, roomPk] = queryKey;
@@ -26,7 +26,7 @@ export const getRoomReviews = ({ queryKey }: QueryFunctionContext) => {
   const [_, roomPk] = queryKey;
   return instance
     .get(`rooms/${roomPk}/reviews`)
-    .then((response) => response.data);
+    .then((response) => response.data.results);
 };
 
 export const getMe = () =>